@@ -0,0 +1,68 @@
+"""
+Compare the batched (Co,N,Ci) layout of the Chebyshev recurrence with the flattened node-major (N,Co*Ci) one used
+by `thgsp.filters.cheby_op`, for Co*Ci from 1 to 256.
+
+    python benchmark/cheby_layout.py --nodes 100000 --density 1e-4 --order 30
+"""
+import argparse
+import time
+
+import torch
+
+from thgsp.filters.approximation import cheby_op, scaled_laplace
+from thgsp.graphs import random_graph, laplace
+
+
+def batched_cheby_op(x, L_norm, coeff):
+    # the former layout: every step multiplies L_norm with a Co x N x Ci batch
+    K = coeff.size(-1) - 1
+    c = coeff.unsqueeze(1)
+    twf_old = x
+    twf_cur = L_norm @ x
+    result = 0.5 * c[..., 0] * twf_old + c[..., 1] * twf_cur
+    for k in range(2, K + 1):
+        twf_new = (L_norm @ twf_cur).mul_(2).sub_(twf_old)
+        result.addcmul_(c[..., k], twf_new)
+        twf_old, twf_cur = twf_cur, twf_new
+    return result
+
+
+def timeit(fn, repeat):
+    fn()  # warm up
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--density", type=float, default=5e-4)
+    parser.add_argument("--order", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    N = args.nodes
+    A = random_graph(N, args.density, dtype=torch.float, device=args.device, seed=0)
+    L = laplace(A, "sym")
+    L_norm = scaled_laplace(L, 2.)
+    print("N={}, nnz={}, K={}, device={}".format(N, A.nnz(), args.order, args.device))
+    print("{:>4} {:>4} {:>12} {:>12} {:>8}".format("Co", "Ci", "batched(ms)", "flat(ms)", "speedup"))
+    for Co, Ci in [(1, 1), (2, 1), (4, 1), (4, 2), (8, 2), (8, 4), (16, 4), (16, 8), (16, 16)]:
+        coeff = torch.rand(Co, Ci, args.order + 1, device=args.device)
+        x = torch.rand(Co, N, Ci, device=args.device)
+        with torch.no_grad():
+            t_batched = timeit(lambda: batched_cheby_op(x, L_norm, coeff), args.repeat)
+            t_flat = timeit(lambda: cheby_op(x, L, coeff), args.repeat)
+        speedup = t_batched / t_flat
+        print("{:>4} {:>4} {:>12.2f} {:>12.2f} {:>7.2f}x".format(Co, Ci, t_batched * 1e3, t_flat * 1e3, speedup))
+
+
+if __name__ == "__main__":
+    main()
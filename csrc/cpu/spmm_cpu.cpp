@@ -0,0 +1,86 @@
+#include "spmm_cpu.h"
+
+#include <ATen/Parallel.h>
+
+#define CHECK_CPU(x) AT_ASSERTM(x.device().is_cpu(), #x " must be CPU tensor")
+
+torch::Tensor spmm_fused_cpu(torch::Tensor rowptr, torch::Tensor col, torch::optional<torch::Tensor> optional_value,
+                             torch::Tensor mat, torch::optional<torch::Tensor> optional_diag,
+                             torch::optional<torch::Tensor> optional_left,
+                             torch::optional<torch::Tensor> optional_right,
+                             torch::optional<torch::Tensor> optional_prev, double alpha, double beta) {
+    CHECK_CPU(rowptr);
+    CHECK_CPU(col);
+    CHECK_CPU(mat);
+    AT_ASSERTM(mat.dim() == 2, "mat must be a 2D tensor");
+
+    rowptr = rowptr.contiguous();
+    col = col.contiguous();
+    mat = mat.contiguous();
+    int64_t N = rowptr.numel() - 1;
+    int64_t C = mat.size(1);
+    AT_ASSERTM(mat.size(0) == N, "mat has mismatched rows");
+
+    auto opt_vec = [&](torch::optional<torch::Tensor> &opt, int64_t numel) {
+        if (opt.has_value()) {
+            CHECK_CPU(opt.value());
+            AT_ASSERTM(opt.value().numel() == numel, "mismatched size");
+            opt = opt.value().to(mat.scalar_type()).contiguous();
+        }
+    };
+    opt_vec(optional_value, col.numel());
+    opt_vec(optional_diag, N);
+    opt_vec(optional_left, N);
+    opt_vec(optional_right, N);
+    if (optional_prev.has_value()) {
+        CHECK_CPU(optional_prev.value());
+        AT_ASSERTM(optional_prev.value().sizes() == mat.sizes(), "prev has mismatched size");
+        optional_prev = optional_prev.value().to(mat.scalar_type()).contiguous();
+    }
+
+    auto out = torch::empty({N, C}, mat.options());
+    auto rowptr_data = rowptr.data_ptr<int64_t>();
+    auto col_data = col.data_ptr<int64_t>();
+
+    AT_DISPATCH_FLOATING_TYPES(mat.scalar_type(), "spmm_fused_cpu", [&] {
+        auto mat_data = mat.data_ptr<scalar_t>();
+        auto out_data = out.data_ptr<scalar_t>();
+        scalar_t *value_data = optional_value.has_value() ? optional_value.value().data_ptr<scalar_t>() : nullptr;
+        scalar_t *diag_data = optional_diag.has_value() ? optional_diag.value().data_ptr<scalar_t>() : nullptr;
+        scalar_t *left_data = optional_left.has_value() ? optional_left.value().data_ptr<scalar_t>() : nullptr;
+        scalar_t *right_data = optional_right.has_value() ? optional_right.value().data_ptr<scalar_t>() : nullptr;
+        scalar_t *prev_data = optional_prev.has_value() ? optional_prev.value().data_ptr<scalar_t>() : nullptr;
+        scalar_t a = (scalar_t) alpha, b = (scalar_t) beta;
+
+        // rows are independent, and every row streams contiguous rows of mat, so the inner loops over C vectorize
+        int64_t grain_size = std::max<int64_t>(1, at::internal::GRAIN_SIZE / std::max<int64_t>(1, C * 8));
+        at::parallel_for(0, N, grain_size, [&](int64_t begin, int64_t end) {
+            std::vector<scalar_t> acc(C);
+            for (int64_t i = begin; i < end; i++) {
+                std::fill(acc.begin(), acc.end(), (scalar_t) 0);
+                for (int64_t e = rowptr_data[i]; e < rowptr_data[i + 1]; e++) {
+                    int64_t j = col_data[e];
+                    scalar_t w = value_data == nullptr ? (scalar_t) 1 : value_data[e];
+                    if (right_data != nullptr)
+                        w *= right_data[j];
+                    const scalar_t *mat_row = mat_data + j * C;
+                    for (int64_t c = 0; c < C; c++)
+                        acc[c] += w * mat_row[c];
+                }
+
+                scalar_t l = left_data == nullptr ? a : a * left_data[i];
+                scalar_t d = diag_data == nullptr ? (scalar_t) 0 : a * diag_data[i];
+                const scalar_t *mat_row = mat_data + i * C;
+                scalar_t *out_row = out_data + i * C;
+                for (int64_t c = 0; c < C; c++)
+                    out_row[c] = d * mat_row[c] + l * acc[c];
+                if (prev_data != nullptr) {
+                    const scalar_t *prev_row = prev_data + i * C;
+                    for (int64_t c = 0; c < C; c++)
+                        out_row[c] += b * prev_row[c];
+                }
+            }
+        });
+    });
+    return out;
+}
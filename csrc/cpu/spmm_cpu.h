@@ -0,0 +1,12 @@
+#pragma once
+
+#include <torch/extension.h>
+
+// out = alpha * (diag * mat + left * (A @ (right * mat))) + beta * prev, wherein A is the CSR matrix
+// (rowptr, col, value) and diag, left, right are per-node vectors. Absent value/left/right mean ones, absent
+// diag/prev mean zeros.
+torch::Tensor spmm_fused_cpu(torch::Tensor rowptr, torch::Tensor col, torch::optional<torch::Tensor> optional_value,
+                             torch::Tensor mat, torch::optional<torch::Tensor> optional_diag,
+                             torch::optional<torch::Tensor> optional_left,
+                             torch::optional<torch::Tensor> optional_right,
+                             torch::optional<torch::Tensor> optional_prev, double alpha, double beta);
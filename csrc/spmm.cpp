@@ -0,0 +1,20 @@
+#include <torch/script.h>
+#include "cpu/spmm_cpu.h"
+
+torch::Tensor spmm_fused(torch::Tensor rowptr, torch::Tensor col, torch::optional<torch::Tensor> optional_value,
+                         torch::Tensor mat, torch::optional<torch::Tensor> optional_diag,
+                         torch::optional<torch::Tensor> optional_left, torch::optional<torch::Tensor> optional_right,
+                         torch::optional<torch::Tensor> optional_prev, double alpha, double beta) {
+    if (mat.device().is_cuda()) {
+    #ifdef WITH_CUDA
+        AT_ERROR("No CUDA version supported");
+    #else
+        AT_ERROR("Not compiled with CUDA support");
+    #endif
+    } else {
+        return spmm_fused_cpu(rowptr, col, optional_value, mat, optional_diag, optional_left, optional_right,
+                              optional_prev, alpha, beta);
+    }
+}
+
+static auto registry = torch::RegisterOperators().op("torch_gsp::spmm_fused", &spmm_fused);
@@ -3,6 +3,7 @@ import os.path as osp
 import sys
 import glob
 import torch
+from torch.__config__ import parallel_info
 from setuptools import setup, find_packages
 from torch.utils.cpp_extension import BuildExtension
 from torch.utils.cpp_extension import CppExtension, CUDAExtension, CUDA_HOME
@@ -21,6 +22,16 @@ def get_extensions():
     extra_compile_args = {'cxx': []}
     extra_link_args = []
 
+    info = parallel_info()  # at::parallel_for in csrc/cpu/spmm_cpu.cpp runs on OpenMP threads if available
+    if 'backend: OpenMP' in info and 'OpenMP not found' not in info:
+        extra_compile_args['cxx'] += ['-DAT_PARALLEL_OPENMP']
+        if sys.platform == 'win32':
+            extra_compile_args['cxx'] += ['/openmp']
+        else:
+            extra_compile_args['cxx'] += ['-fopenmp']
+    else:
+        print('Compiling without OpenMP...')
+
     if WITH_CUDA:
         Extension = CUDAExtension
         macros += [('WITH_CUDA', None)]
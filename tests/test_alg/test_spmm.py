@@ -0,0 +1,48 @@
+import pytest
+import torch
+
+from thgsp.alg.spmm import spmm_py, spmm_cpp, spmm
+from thgsp.graphs.generators import random_graph
+
+from ..utils4t import devices, float_dtypes
+
+
+@pytest.mark.parametrize('dtype', float_dtypes)
+def test_spmm_cpp(dtype):
+    N, C = 50, 7
+    A = random_graph(N, 0.2, dtype=dtype)
+    x = torch.rand(N, C, dtype=dtype)
+    prev = torch.rand(N, C, dtype=dtype)
+    diag, left, right = torch.rand(3, N, dtype=dtype)
+    expected = spmm_py(A, x, diag, left, right, prev, 2., -1.)
+    assert torch.allclose(spmm_cpp(A, x, diag, left, right, prev, 2., -1.), expected)
+    assert torch.allclose(spmm_cpp(A, x), A @ x)
+
+
+@pytest.mark.parametrize('dtype', float_dtypes)
+@pytest.mark.parametrize('device', devices)
+def test_spmm(dtype, device):
+    N = 30
+    A = random_graph(N, 0.2, dtype=dtype, device=device)
+    x = torch.rand(N, dtype=dtype, device=device)
+    prev = torch.rand(N, dtype=dtype, device=device)
+    y = spmm(A, x, prev=prev, alpha=2., beta=-1.)
+    assert y.shape == (N,)
+    assert torch.allclose(y, 2 * (A @ x[:, None]).squeeze(-1) - prev)
+
+    x.requires_grad_()
+    spmm(A, x).sum().backward()  # falls back to torch_sparse for autograd
+    assert x.grad is not None
+
+
+def test_spmm_dispatch():
+    from thgsp.alg.spmm import _use_fused, _fused_available
+    N, C = 20, 3
+    A = random_graph(N, 0.3, dtype=torch.double)
+    x = torch.rand(N, C, dtype=torch.double)
+    assert _fused_available()
+    assert _use_fused(A, x)
+    assert not _use_fused(A, x.int())
+    assert not _use_fused(A, x.requires_grad_())
+    with pytest.raises(RuntimeError):  # errors of the kernel are not hidden by the fallback
+        spmm(A, torch.rand(N + 1, C, dtype=torch.double))
@@ -35,6 +35,21 @@ class TestCheby:
         x = c.new_empty(N).random_()
         r = cheby_op(x, L, c[0])
         assert r.shape == (Co, N, Ci)
+        assert r.is_contiguous()
+
+    def test_cheby_op_matrix_free(self, device, dtype):
+        from thgsp.graphs import LaplacianOperator, laplace, random_graph
+        K = 8
+        c = cheby_coeff(krns, K=K, device=device, dtype=dtype)
+        M, Co, Ci = krns.shape
+        N = 60
+        A = random_graph(N, 0.1, dtype=dtype, device=device)
+        x = torch.rand(N, Ci, dtype=dtype, device=device)
+        for lap_type in ["sym", "comb"]:
+            lam_max = 2. if lap_type == "sym" else A.max_frequency(lap_type)
+            r1 = cheby_op(x, laplace(A, lap_type), c[0], lam_max)
+            r2 = cheby_op(x, LaplacianOperator(A, lap_type), c[0], lam_max)
+            assert torch.allclose(r1, r2, atol=1e-4)
 
 
 @pytest.mark.parametrize('dtype', float_dtypes)
@@ -87,3 +102,163 @@ def test_cheby_op_basis(dtype):
     err = 1e-5 if dtype is float_dtypes[0] else 1e-12
     assert (yts0 - y0[:]).sum() < err
     assert (yts1 - y1[:]).sum() < err
+
+
+def test_scaled_laplace_memo():
+    import gc
+    from thgsp.filters.approximation import scaled_laplace, normalize_laplace, _scaled_laplacians
+    from thgsp.graphs import LaplacianOperator, laplace, random_graph
+    A = random_graph(20, 0.2, dtype=torch.double)
+    L = laplace(A, "sym")
+    Ln = scaled_laplace(L, 1.8)
+    assert scaled_laplace(L, 1.8) is Ln
+    assert scaled_laplace(L, 2.) is not Ln
+    assert torch.allclose(Ln.to_dense(), normalize_laplace(L, 1.8).to_dense())
+    op = LaplacianOperator(A)
+    assert scaled_laplace(op, 2.) is scaled_laplace(op, 2.)
+
+    key = id(L)
+    del L, Ln
+    gc.collect()
+    assert key not in _scaled_laplacians
+
+
+@pytest.mark.parametrize('dtype', float_dtypes)
+def test_cheby_op_shared_basis(dtype):
+    from thgsp.graphs import laplace, random_graph
+    c = cheby_coeff(krns, K=10, dtype=dtype)[0]
+    Co, Ci, _ = c.shape
+    N = 40
+    L = laplace(random_graph(N, 0.2, dtype=dtype), "sym")
+    x = torch.rand(N, Ci, dtype=dtype)
+    shared = cheby_op(x, L, c)
+    replicated = cheby_op(x.expand(Co, N, Ci).clone(), L, c)
+    assert shared.shape == (Co, N, Ci)
+    assert torch.allclose(shared, replicated)
+    assert torch.allclose(shared, cheby_op(x[None], L, c))
+
+
+@pytest.mark.parametrize('dtype', float_dtypes)
+@pytest.mark.parametrize('K', [0, 1, 10])
+def test_cheby_clenshaw(dtype, K):
+    from thgsp.filters.approximation import cheby_clenshaw
+    from thgsp.graphs import laplace, random_graph, LaplacianOperator
+    c = cheby_coeff(krns, K=K, dtype=dtype)[0]
+    Co, Ci, _ = c.shape
+    N = 40
+    A = random_graph(N, 0.2, dtype=dtype)
+    x = torch.rand(N, Ci, dtype=dtype)
+    expected = cheby_op(x, laplace(A, "sym"), c, 1.9)
+    assert torch.allclose(cheby_clenshaw(x, laplace(A, "sym"), c, 1.9), expected)
+
+    out = torch.empty(Co, N, Ci, dtype=dtype)
+    workspace = (torch.empty_like(out), torch.empty_like(out))
+    y = cheby_clenshaw(x, LaplacianOperator(A), c, 1.9, out=out, workspace=workspace)
+    assert y is out
+    assert torch.allclose(out, expected)
+
+    with pytest.raises(RuntimeError):
+        cheby_clenshaw(x.requires_grad_(), laplace(A, "sym"), c)
+
+
+@pytest.mark.parametrize('K', [1, 2, 15])
+@pytest.mark.parametrize('shared', [True, False])
+def test_cheby_op_memory_efficient(K, shared):
+    from thgsp.graphs import laplace, random_graph
+    dtype = torch.double
+    c = cheby_coeff(krns, K=K, dtype=dtype)[0].requires_grad_()
+    Co, Ci, _ = c.shape
+    N = 30
+    A = random_graph(N, 0.3, dtype=dtype)
+    row, col, val = A.coo()
+    x = torch.rand(N, Ci, dtype=dtype) if shared else torch.rand(Co, N, Ci, dtype=dtype)
+    x.requires_grad_()
+    w = torch.rand(Co, N, Ci, dtype=dtype)
+
+    grads = []
+    for memory_efficient in (False, True):
+        val_ = val.clone().requires_grad_()
+        L = laplace(SparseTensor(row=row, col=col, value=val_, sparse_sizes=(N, N)), "comb")
+        y = cheby_op(x, L, c, 1.5 * N, memory_efficient=memory_efficient)
+        (y * w).sum().backward()
+        grads.append((y.detach(), x.grad.clone(), c.grad.clone(), val_.grad.clone()))
+        x.grad, c.grad = None, None
+
+    for plain, lean in zip(*grads):
+        assert torch.allclose(plain, lean)
+
+
+def test_cheby_truncate():
+    from thgsp.filters.approximation import cheby_truncate, cheby_trim
+    dtype = torch.double
+    krn = np.array([[[lambda x: torch.exp(-x), meyer_kernel]]])
+    c = cheby_coeff(krn, K=60, dtype=dtype)
+    truncated, orders = cheby_truncate(c, krn, tol=1e-6)
+    assert orders.shape == (1, 1, 2)
+    assert orders[0, 0, 0] < 15 < orders[0, 0, 1]
+    assert (truncated[0, 0, 0, orders[0, 0, 0] + 1:] == 0).all()
+    assert torch.equal(truncated[0, 0, 1, :orders[0, 0, 1] + 1], c[0, 0, 1, :orders[0, 0, 1] + 1])
+
+    smooth = truncated[0, :, :1]
+    assert cheby_trim(smooth).size(-1) == orders[0, 0, 0] + 1
+    L = SparseTensor.eye(10, dtype=dtype)
+    x = torch.rand(10, 1, dtype=dtype)
+    assert torch.allclose(cheby_op(x, L, smooth), cheby_op(x, L, cheby_trim(smooth)))
+
+
+@pytest.mark.parametrize('dtype', float_dtypes)
+@pytest.mark.parametrize('P,K', [(21, 20), (64, 10), (5, 9)])
+def test_cheby_dct(dtype, P, K):
+    from thgsp.filters.approximation import cheby_dct, evaluate_kernels
+    points = np.pi * (torch.arange(P, dtype=torch.double) + 0.5) / P
+    gs = evaluate_kernels(krns, torch.cos(points) + 1).to(dtype)
+    assert gs.shape == (*krns.shape, P)
+    cosine = torch.cos(points.unsqueeze(-1) * torch.arange(K + 1, dtype=torch.double)).to(dtype)
+    expected = gs @ cosine * 2. / P
+    err = 1e-4 if dtype is float_dtypes[0] else 1e-10
+    assert torch.allclose(cheby_dct(gs, K), expected, atol=err)
+
+
+def test_coeff_cache():
+    from thgsp.filters import coeff_cache_info, clear_coeff_cache
+    clear_coeff_cache()
+    c1 = cheby_coeff(krns, K=12, dtype=torch.double)
+    info = coeff_cache_info()
+    assert len(info["keys"]) == 2  # two distinct kernels
+    c2 = cheby_coeff(krns, K=12, dtype=torch.double)
+    assert coeff_cache_info()["hits"] - info["hits"] == 2
+    assert torch.equal(c1, c2)
+    c2.zero_()  # results never alias the cache
+    assert torch.equal(cheby_coeff(krns, K=12, dtype=torch.double), c1)
+
+    cheby_coeff(krns, K=12, lam_max=1.5, dtype=torch.double)
+    assert len(coeff_cache_info()["keys"]) == 4
+    clear_coeff_cache()
+    assert len(coeff_cache_info()["keys"]) == 0
+
+
+@pytest.mark.parametrize('damping', ["jackson", "lanczos"])
+def test_cheby_damping(damping):
+    from thgsp.filters.approximation import cheby_damping, cheby_truncate
+    g = cheby_damping(20, damping, torch.double)
+    assert g.shape == (21,)
+    assert g[0] == 1 and (g[1:] < 1).all() and (g.diff() <= 0).all()
+    with pytest.raises(ValueError):
+        cheby_damping(20, "gauss")
+
+    # damping removes the overshoot(Gibbs oscillation) of the ideal low-pass kernel
+    K = 30
+    x = torch.linspace(0, 2, 500, dtype=torch.double)
+    basis = torch.cos(torch.arange(K + 1, dtype=torch.double)[:, None] * torch.acos(x - 1))
+    basis[0] *= 0.5
+    plain = cheby_coeff(ideal_kernel, K=K, num_points=200, dtype=torch.double)[0, 0, 0]
+    damped = cheby_coeff(ideal_kernel, K=K, num_points=200, dtype=torch.double, damping=damping)[0, 0, 0]
+    assert (plain @ basis).max() > 1.05
+    assert (damped @ basis).max() < 1.02
+
+    c = cheby_coeff(meyer_kernel, K=60, dtype=torch.double)
+    _, plain_orders = cheby_truncate(c, meyer_kernel, tol=1e-2)
+    truncated, orders = cheby_truncate(c, meyer_kernel, tol=1e-2, damping=damping)
+    assert orders.item() <= 60
+    k = orders.item()
+    assert torch.allclose(truncated[0, 0, 0, :k + 1], c[0, 0, 0, :k + 1] * cheby_damping(k, damping, torch.double))
@@ -84,3 +84,91 @@ class TestFilter:
                 assert y.shape == (flt.N,)
             else:
                 assert y.shape == (flt.N, flt.Co)
+
+    def test_partial_evd_filter(self):
+        N, k = 40, 6
+        g = random_graph(N, density=0.2, dtype=torch.double)
+        flt = Filter(g, lambda x: torch.ones_like(x))
+        U = g.U(k=k)
+        x = U @ torch.rand(k, dtype=torch.double)  # a k-bandlimited signal
+        y = flt.filter(x, k=k)
+        assert y.shape == (1, N, 1)
+        assert torch.allclose(y.view(-1), x, atol=1e-8)
+        assert flt.evaluate(k=k).shape == (1, 1, k)
+
+    def test_truncation_error(self):
+        N, k = 40, 10
+        g = random_graph(N, density=0.2, dtype=torch.double)
+        heat = lambda x: torch.exp(-3 * x)  # noqa
+        flt = Filter(g, heat, lam_max=g.spectrum().max().item())
+        x = torch.rand(N, dtype=torch.double)
+        y, err = flt.filter(x, k=k, return_error=True)
+        assert err.shape == (1, 1)
+        true_err = (flt.filter(x) - y).norm()
+        assert true_err <= err[0, 0] * (1 + 1e-6)
+        assert flt.filter(x, return_error=True)[1].abs().sum() == 0
+
+    def test_partial_evd_once(self, monkeypatch):
+        import thgsp.graphs.core as core
+        calls = []
+        solver = core.partial_eigh
+        monkeypatch.setattr(core, "partial_eigh", lambda *args: calls.append(args) or solver(*args))
+        g = random_graph(40, density=0.2, dtype=torch.double)  # no cache
+        flt = Filter(g, meyer_kernel, lap_type="comb")
+        y, err = flt.filter(torch.rand(40, dtype=torch.double), k=5, return_error=True)
+        assert len(calls) == 1
+
+    def test_auto_lam_max(self):
+        g = random_graph(40, density=0.2, dtype=torch.double)
+        flt = Filter(g, meyer_kernel, lam_max="auto", lap_type="comb")
+        assert flt.lam_max >= g.spectrum("comb").max() * (1 - 1e-3)
+        x = torch.rand(40, dtype=torch.double)
+        y = flt.cheby_filter(x)
+        assert y.shape == (1, 40, 1)
+
+
+def test_auto_order():
+    g = random_graph(30, density=0.3, dtype=torch.double)
+    krns = np.array([[lambda x: torch.exp(-x), meyer_kernel]])
+    flt = Filter(g, krns, order="auto", tol=1e-6)
+    assert 1 < flt.order < 128
+    assert flt.cheby_coefficients.shape == (1, 2, flt.order + 1)
+    x = torch.rand(30, 2, dtype=torch.double)
+    assert torch.allclose(flt(x), Filter(g, krns, order=flt.order)(x), atol=1e-4)
+
+
+def test_lanczos_engine():
+    N = 40
+    g = random_graph(N, density=0.2, dtype=torch.double)
+    heat = lambda x: torch.exp(-2 * x)  # noqa
+    krns = np.array([[heat, meyer_kernel], [meyer_kernel, heat]])
+    flt = Filter(g, krns, order=15)
+    x = torch.rand(N, 2, dtype=torch.double)
+    exact = flt.filter(x)
+    lanczos = flt.lanczos_filter(x)
+    assert lanczos.shape == exact.shape == (2, N, 2)
+    assert torch.allclose(lanczos[0, :, 0], exact[0, :, 0], atol=1e-6)  # heat kernel
+    assert torch.allclose(flt(x, engine="lanczos"), (lanczos @ flt.weight[:, :, None]).permute(1, 0, 2).squeeze())
+
+    x3 = torch.rand(2, N, 2, dtype=torch.double)
+    assert torch.allclose(flt.lanczos_filter(x3, order=N), flt.filter(x3), atol=1e-6)
+    with pytest.raises(RuntimeError):
+        flt(x, engine="magic")
+
+
+def test_stream():
+    N, T = 20, 13
+    g = random_graph(N, density=0.3, dtype=torch.double)
+    krns = np.array([[meyer_kernel, ideal_kernel], [ideal_kernel, meyer_kernel], [meyer_kernel, meyer_kernel]])
+    flt = Filter(g, krns, order=10, weight=torch.rand(3, 2, dtype=torch.double))
+    signals = np.random.rand(T, N, 2)
+    expected = torch.stack([flt(torch.as_tensor(s)) for s in signals])  # T x N x Co
+
+    blocks = list(flt.stream(signals, chunk_size=5))
+    assert [b.shape for b in blocks] == [(5, N, 3), (5, N, 3), (3, N, 3)]
+    assert torch.allclose(torch.cat(blocks), expected)
+
+    out = torch.empty(T, N, 3, dtype=torch.double)
+    for _ in flt.stream(iter(torch.as_tensor(signals).split(4)), out=out):
+        pass
+    assert torch.allclose(out, expected)
@@ -1,3 +1,5 @@
+import math
+
 import pytest
 from ..utils4t import float_dtypes, devices, color_strategies, num_strategies, partition_strategy
 from thgsp.filters.qmf import *
@@ -296,3 +298,135 @@ class TestBiorWaveletBasis:
     def display_density(self, op, inv_op):
         print("Ta       density: ", op.density())
         print("Ta^-1    density: ", inv_op.density())
+
+
+def test_biorth_kernels_cached():
+    from thgsp.filters.kernels import design_biorth_kernel, biorth_cache_info, clear_biorth_cache
+    clear_biorth_cache()
+    assert biorth_kernels(4) is biorth_kernels(4)
+    h0_c, g0_c, theta = design_biorth_kernel(4)
+    h0_c[:] = 0  # copies are returned
+    assert (design_biorth_kernel(4)[0] != 0).any()
+    assert biorth_cache_info()["design"]["misses"] == 1
+
+
+@pytest.mark.parametrize('zeroDC', [False, True])
+@pytest.mark.parametrize('biorth', [False, True])
+def test_kernel_tree(zeroDC, biorth):
+    M, N, Ci = 3, 30, 2
+    Bs = [rand_udg(N, 0.2, dtype=torch.double) for _ in range(M)]
+    beta = np.random.rand(N, M) > 0.5
+    fb = BiorthCore(Bs, beta, k=3, order=10, in_channels=Ci, zeroDC=zeroDC) if biorth else \
+        QmfCore(Bs, beta, order=10, in_channels=Ci, zeroDC=zeroDC)
+    nodes, reps = fb.kernel_tree(fb.kernel_a)
+    assert [len(r) for r in reps] == [2, 4, 8]
+
+    x = torch.rand(N, Ci, dtype=torch.double)
+    y = fb.analyze(x)  # on the tree
+    expected = fb.analyze(x.expand(fb.Co, N, Ci))  # channel by channel
+    assert torch.allclose(y, expected)
+
+    z = fb.synthesize(y, reduce=True)
+    assert z.shape == (1, N, Ci)
+    assert torch.allclose(z, fb.synthesize(y).sum(0, keepdim=True))
+
+
+def test_packed_coefficients():
+    from thgsp.filters import PackedCoefficients, nla, hard_threshold
+    M, N, Ci = 2, 25, 2
+    Bs = [rand_udg(N, 0.2, dtype=torch.double) for _ in range(M)]
+    beta = np.random.rand(N, M) > 0.5
+    qmf = QmfCore(Bs, beta, order=10, in_channels=Ci)
+    x = torch.rand(N, Ci, dtype=torch.double)
+    dense = qmf.analyze(x)
+    packed = qmf.analyze(x, compact=True)
+    assert isinstance(packed, PackedCoefficients)
+    assert packed.values.shape == (N, Ci)
+    assert packed.shape == dense.shape
+    assert torch.equal(packed.to_dense(), dense)
+    assert torch.equal(PackedCoefficients.from_dense(dense, qmf.channel_mask).values, packed.values)
+    for c in range(qmf.Co):
+        assert torch.equal(packed.channel(c), dense[c, packed.nodes(c)])
+        assert packed.channel(c)._base is packed.values  # zero-copy
+    assert torch.allclose(qmf.synthesize(packed), qmf.synthesize(dense))
+
+    assert torch.equal(nla(packed, k=5).to_dense(), nla(dense, k=5))
+    assert torch.equal(nla(packed, k=5, scheme="keeplow").to_dense(), nla(dense, k=5, scheme="keeplow"))
+    assert torch.equal(hard_threshold(packed, 0.3, True).to_dense(), hard_threshold(dense, 0.3, True))
+
+
+def test_zero_dc():
+    from thgsp.filters.approximation import cheby_op
+    N = 20
+    Bs = [rand_udg(N, 0.3, dtype=torch.double)]
+    beta = np.random.rand(N, 1) > 0.5
+    qmf = QmfCore(Bs, beta, order=12, zeroDC=True)
+    d05 = Bs[0].sum(0).pow(0.5)  # no isolated node with the density
+    x = torch.rand(N, 1, dtype=torch.double)
+    expected = cheby_op(d05.view(-1, 1) * x, qmf.bptL[0], qmf.coefficient_a[0])
+    expected.masked_fill_(~qmf.channel_mask.unsqueeze(-1), 0)
+    y = qmf.analyze(x)
+    assert torch.allclose(y, expected)
+    z = qmf.synthesize(y)
+    assert torch.allclose(z, cheby_op(y, qmf.bptL[0], qmf.coefficient_s[0]) / d05.view(-1, 1))
+
+
+def test_sparse_basis():
+    N = 40
+    G = rand_udg(N, 0.2, dtype=torch.double)
+    bptG, beta, _, _, _ = harary(G)
+    exact = QmfOperator(bptG, beta, order=8)
+    full = QmfOperator(bptG, beta, order=8, mode="torch")
+    assert torch.allclose(full.operator.to_dense(), exact.operator.to_dense(), atol=1e-10)
+    assert exact.approximation_error() < 1e-8
+
+    sparse = QmfOperator(bptG, beta, order=8, mode="torch", tol=1e-3, max_nnz=10)
+    assert sparse.nnz < full.nnz
+    assert (sparse.operator.storage.rowcount() <= 10).all()
+    assert sparse.approximation_error() < 0.1
+
+    bio = BiorthOperator(bptG, beta, k=2, mode="torch", tol=1e-4)
+    error_a, error_s = bio.approximation_error()
+    assert error_a < 0.05 and error_s < 0.05
+    assert len(bio.nnz) == 2
+
+
+@pytest.mark.parametrize('biorth', [False, True])
+def test_wavelet_pyramid(biorth):
+    from thgsp.filters import WaveletPyramid
+    N = 80
+    G = rand_udg(N, 0.1, dtype=torch.double)
+    pyramid = WaveletPyramid(G, levels=3, biorth=biorth, order=24)
+    assert 1 < pyramid.levels <= 3
+    sizes = [g.n_node for g in pyramid.graphs]
+    assert sizes[0] == N and all(a > b for a, b in zip(sizes, sizes[1:]))
+
+    x = torch.rand(N, 1, dtype=torch.double)
+    coeffs = pyramid.analyze(x)
+    assert [c.shape[1] for c in coeffs] == sizes
+    for g in pyramid.graphs[1:]:  # the nonzeros stay O(|E|) and shrink with the nodes
+        assert g.nnz() <= 2 * math.ceil(G.nnz() / N) * g.n_node
+    assert all((c[0] == 0).all() for c in coeffs[:-1])
+    single = pyramid.banks[0]
+    error = (pyramid.synthesize(coeffs) - x).norm()
+    assert error <= 10 * (single.synthesize(single.analyze(x), reduce=True)[0] - x).norm() + 1e-3 * x.norm()
+
+
+@pytest.mark.parametrize('damping', ["jackson", "lanczos"])
+def test_damping(damping):
+    from thgsp.filters.approximation import cheby_damping
+    N = 40
+    G = rand_udg(N, 0.2, dtype=torch.double)
+    plain = ColorQmf(G, order=16)
+    damped = ColorQmf(G, order=16, damping=damping)
+    g = cheby_damping(16, damping, dtype=torch.double)
+    assert torch.allclose(damped.coefficient_a, plain.coefficient_a * g)
+    assert damped.damping == damping
+
+    coarse = ColorQmf(G, order="auto", tol=1e-2, damping=damping)
+    fine = ColorQmf(G, order="auto", tol=1e-6, damping=damping)
+    assert coarse.order <= fine.order
+    num = NumQmf(G, strategy="amfs", order=16, damping=damping)
+    assert torch.allclose(num.coefficient_a, NumQmf(G, strategy="amfs", order=16).coefficient_a * g)
+    bio = ColorBiorth(G, k=4, order=16, damping=damping)
+    assert torch.allclose(bio.coefficient_s, ColorBiorth(G, k=4, order=16).coefficient_s * g)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+import torch
+
+from thgsp.filters import Filter, meyer_kernel
+from thgsp.graphs import GraphBatch, random_graph
+from ..utils4t import devices
+
+
+def heat(x):
+    return torch.exp(-x)
+
+
+def test_graph_batch():
+    graphs = [random_graph(N, 0.3, dtype=torch.double) for N in (5, 9, 7)]
+    G = GraphBatch(graphs)
+    assert G.num_graphs == 3
+    assert G.n_node == 21
+    assert G.ptr.tolist() == [0, 5, 14, 21]
+    assert G.batch.tolist() == [0] * 5 + [1] * 9 + [2] * 7
+
+    dense = G.to_dense()
+    for g, lo, hi in zip(graphs, G.ptr[:-1], G.ptr[1:]):
+        assert torch.allclose(dense[lo:hi, lo:hi], g.to_dense())
+    assert torch.isclose(dense.sum(), sum(g.to_dense().sum() for g in graphs))
+
+    x = torch.rand(2, 21, 3)
+    assert [p.shape for p in G.split(x)] == [(2, 5, 3), (2, 9, 3), (2, 7, 3)]
+
+    lam = G.max_frequencies()
+    assert lam.shape == (3,)
+    assert G.max_frequency() == lam.max().item()
+    assert G.max_frequencies() is lam  # cached
+    bound = G.max_frequencies(method="gershgorin")
+    assert (lam <= bound).all()
+    for g, lam_g, bound_g in zip(graphs, lam, bound):
+        exact = g.spectrum().max()
+        assert 0.9 * exact <= lam_g and exact <= bound_g * (1 + 1e-6)
+    lanczos = G.max_frequencies(method="lanczos")
+    assert torch.allclose(lanczos, torch.as_tensor([g.max_frequency() for g in graphs], dtype=torch.double))
+
+
+@pytest.mark.parametrize('device', devices)
+@pytest.mark.parametrize('lap_type', ['sym', 'comb'])
+@pytest.mark.parametrize('matrix_free', [True, False])
+def test_batch_filter(device, lap_type, matrix_free):
+    graphs = [random_graph(N, 0.3, dtype=torch.double, device=device) for N in (6, 11, 8)]
+    G = GraphBatch(graphs)
+    kernels = np.array([[meyer_kernel], [heat]])
+    flt = Filter(G, kernels, lam_max="auto", lap_type=lap_type, order=15, matrix_free=matrix_free)
+    assert flt.lam_maxes.shape == (3,)
+    x = torch.rand(G.n_node, 1, dtype=torch.double, device=device)
+    y = flt.cheby_filter(x)  # 2 x N x 1
+    for g, lam_max, xg, yg in zip(graphs, flt.lam_maxes, G.split(x, 0), G.split(y)):
+        expected = Filter(g, kernels, lam_max=lam_max.item(), lap_type=lap_type, order=15).cheby_filter(xg)
+        assert torch.allclose(yg, expected)
+    block = next(flt.stream(x.view(1, -1, 1)))  # 1 x N x 2, the weights are ones
+    assert torch.allclose(block[0], y.sum(-1).t())
@@ -0,0 +1,48 @@
+import torch
+
+from thgsp.graphs.cache import SpectralCache, nbytes
+from thgsp.graphs.generators import random_graph
+
+
+def test_lru_budget():
+    cache = SpectralCache(max_bytes=3 * 8 * 10)
+    for i in range(4):
+        cache.put(i, torch.zeros(10, dtype=torch.double))
+    assert len(cache) == 3
+    assert 0 not in cache
+    assert cache.evictions == 1
+    assert cache.nbytes == 3 * 8 * 10
+
+    cache.get(1)  # 1 becomes the most recently used
+    cache.put(4, torch.zeros(10, dtype=torch.double))
+    assert 1 in cache and 2 not in cache
+    assert cache.get(2) is None
+    assert cache.hits == 1 and cache.misses == 1
+
+    cache.put(5, torch.zeros(100, dtype=torch.double))  # larger than the budget
+    assert 5 not in cache
+    assert nbytes((torch.zeros(2), torch.zeros(3))) == 5 * 4
+
+
+def test_graph_cache():
+    G = random_graph(20, 0.3, dtype=torch.double)
+    G = type(G)(G, cache=True)
+    U_sym = G.U("sym")
+    U_comb = G.U("comb")
+    assert not torch.allclose(U_sym.abs(), U_comb.abs())
+    assert G.U("sym") is U_sym
+    assert G.spectrum("comb") is G.spectral("comb")[0]
+    info = G.cache_info()
+    assert info["hits"] > 0
+    assert ("eig", "sym", G.dtype(), G.device(), None, None) in info["keys"]
+
+    G.clear_cache()
+    assert G.cache_info()["nbytes"] == 0
+
+    G = type(G)(G, cache=True, cache_budget=nbytes(U_sym) + 1024)
+    G.U("sym")
+    G.U("comb")
+    assert G.cache_info()["evictions"] > 0
+
+    G = type(G)(G, cache=False)
+    assert G.U("sym") is not G.U("sym")
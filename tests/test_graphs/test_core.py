@@ -1,4 +1,9 @@
+import pytest
+import torch
+
 from thgsp.graphs.core import Graph, DiGraph
+from thgsp.graphs.generators import random_graph
+from ..utils4t import devices, float_dtypes
 
 
 class TestGraph:
@@ -9,3 +14,33 @@ class TestGraph:
 class TestDiGraph:
     def test_init(self):
         return
+
+
+@pytest.mark.parametrize('device', devices)
+@pytest.mark.parametrize('dtype', float_dtypes)
+@pytest.mark.parametrize('which', ['SA', 'LA'])
+def test_partial_spectral(device, dtype, which):
+    N, k = 30, 4
+    G = random_graph(N, 0.3, dtype=dtype, device=device)
+    fs_full, _ = G.spectral()
+    fs, U = G.spectral(k=k, which=which)
+    assert fs.shape == (k,)
+    assert U.shape == (N, k)
+    expected = fs_full[:k] if which == 'SA' else fs_full[-k:]
+    assert torch.allclose(fs, expected, atol=1e-4)
+    # eigenvectors satisfy L @ U = U @ diag(fs)
+    L = G.L().to_dense()
+    assert torch.allclose(L @ U, U * fs, atol=1e-4)
+
+
+@pytest.mark.parametrize('lap_type', ['sym', 'comb', 'rw'])
+@pytest.mark.parametrize('method', ['lanczos', 'power', 'gershgorin'])
+def test_max_frequency(lap_type, method):
+    G = random_graph(50, 0.2, dtype=torch.double)
+    # D^{-1}L shares the spectrum with L_sym, whereas G.spectrum("rw") is of the symmetrized (L_rw+L_rw^T)/2
+    lam_max = G.spectrum("sym" if lap_type == "rw" else lap_type).max().item()
+    estimate = G.max_frequency(lap_type, method)
+    assert estimate >= lam_max * (1 - 1e-3)
+    if method != 'gershgorin':
+        assert estimate <= lam_max * 1.02
+    assert G.max_frequency(lap_type, method) == estimate  # cached
@@ -0,0 +1,42 @@
+import numpy as np
+import torch
+from torch_sparse import SparseTensor
+
+from thgsp.bga import cached_decomposition, harary
+from thgsp.graphs import Graph, fingerprint
+from thgsp.graphs.generators import random_graph
+
+
+def test_fingerprint():
+    G = random_graph(30, 0.2, dtype=torch.double)
+    fp = G.fingerprint()
+    assert G.fingerprint() is fp  # memoized
+    assert Graph(G).fingerprint() == fp
+    assert fingerprint(SparseTensor.from_dense(G.to_dense())) == fp
+
+    row, col, val = G.coo()
+    val = val.clone()
+    val[0] += 1
+    assert fingerprint(SparseTensor(row=row, col=col, value=val, sparse_sizes=G.sizes())) != fp
+    assert fingerprint(G.to(torch.float)) != fp
+
+
+def counted_harary(A, **kwargs):
+    counted_harary.calls += 1
+    return harary(A, **kwargs)
+
+
+def test_cached_decomposition():
+    G = random_graph(30, 0.3, dtype=torch.double)
+    counted_harary.calls = 0
+    bptG, beta = cached_decomposition(counted_harary, G)[:2]
+    expected = bptG[0].toarray(), beta.copy()
+    bptG[0][0, 0] = 123.  # in-place modifications of a result
+    beta[:] = 0
+
+    bptG2, beta2 = cached_decomposition(counted_harary, Graph(G))[:2]
+    assert counted_harary.calls == 1  # memoized
+    assert np.array_equal(bptG2[0].toarray(), expected[0])
+    assert np.array_equal(beta2, expected[1])
+    cached_decomposition(counted_harary, G, threshold=0.5)
+    assert counted_harary.calls == 2
@@ -16,3 +16,25 @@ def test_laplace(lap_type):
     spA = SparseTensor.from_dense(A)
     L = laplace(spA, lap_type).to_dense()
     print("\n:", L)
+
+
+@pytest.mark.parametrize("lap_type", lap_types)
+def test_laplacian_operator(lap_type):
+    from thgsp.graphs.laplace import LaplacianOperator
+    N = 8
+    A = torch.rand(N, N, dtype=torch.double)
+    A = A + A.t()
+    A.fill_diagonal_(0)
+    A[0] = A[:, 0] = 0  # an isolated node
+    spA = SparseTensor.from_dense(A)
+    L = laplace(spA, lap_type).to_dense()
+    op = LaplacianOperator(spA, lap_type)
+    x = torch.rand(N, 3, dtype=torch.double)
+    assert torch.allclose(op @ x, L @ x)
+    assert torch.allclose(op @ x[:, 0], L @ x[:, 0])
+    assert torch.allclose(op @ x.unsqueeze(0).expand(2, N, 3), L @ x)
+
+    Ln = op.normalize(1.5)
+    expected = 2 / 1.5 * L - torch.eye(N, dtype=torch.double)
+    assert torch.allclose(Ln @ x, expected @ x)
+    assert torch.allclose(Ln.to_sparse_tensor().to_dense(), expected)
@@ -0,0 +1,39 @@
+import torch
+
+from thgsp.graphs import kron_reduction, rand_udg
+
+
+def test_kron_reduction():
+    N = 12
+    G = rand_udg(N, 0.4, dtype=torch.double)
+    A = G.to_dense()
+    L = torch.diag(A.sum(1)) - A
+    keep = torch.tensor([0, 2, 3, 7, 11])
+    removed = torch.tensor([i for i in range(N) if i not in keep.tolist()])
+    schur = L[keep][:, keep] - L[keep][:, removed] @ torch.inverse(L[removed][:, removed]) @ L[removed][:, keep]
+
+    A_red = kron_reduction(G, keep, tol=0, exact=True).to_dense()
+    assert A_red.shape == (5, 5)
+    assert torch.allclose(A_red, -schur.fill_diagonal_(0), atol=1e-10)
+    assert torch.allclose(A_red, A_red.t())
+
+    mask = torch.zeros(N, dtype=torch.bool)
+    mask[keep] = True
+    assert torch.allclose(kron_reduction(G, mask, tol=0, exact=True).to_dense(), A_red)
+
+
+def test_local_kron_reduction():
+    N = 60
+    G = rand_udg(N, 0.2, dtype=torch.double)
+    A = G.to_dense()
+    keep = torch.arange(0, N, 2)
+    removed = torch.arange(1, N, 2)
+    A[removed[:, None], removed] = 0  # removed nodes are independent, where the local reduction is exact
+    exact = kron_reduction(A, keep, tol=0, exact=True).to_dense()
+    assert torch.allclose(kron_reduction(A, keep, tol=0).to_dense(), exact, atol=1e-10)
+
+    A_red = kron_reduction(G, keep, max_degree=3)
+    assert A_red.nnz() <= 2 * 3 * len(keep)
+    assert (A_red.storage.rowcount() > 0).all()  # the heaviest edge of every node is kept
+    dense = A_red.to_dense()
+    assert torch.equal(dense, dense.t())
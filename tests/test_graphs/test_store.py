@@ -0,0 +1,35 @@
+import torch
+
+from thgsp.filters import Filter, meyer_kernel
+from thgsp.graphs import EigenStore, Graph
+from thgsp.graphs.generators import random_graph
+
+
+def test_eigen_store(tmp_path):
+    G = random_graph(30, 0.3, dtype=torch.double)
+    G = Graph(G, store=str(tmp_path))
+    fs, U = G.spectral("comb")
+    digest = G.fingerprint()
+    assert (digest, EigenStore.spectral_name("comb", dtype=torch.double) + "-U") in G.store
+
+    G2 = Graph(G, store=EigenStore(str(tmp_path)))  # a new object with the same content
+    assert G2.fingerprint() == digest
+    fs2, U2 = G2.spectral("comb")
+    assert torch.equal(fs, fs2)
+    assert torch.equal(U, U2)
+
+    fs_k, U_k = G2.spectral("sym", k=3)
+    fs_k2, U_k2 = G2.store.load_spectral(digest, "sym", 3, "SA", torch.double)
+    assert torch.equal(fs_k, fs_k2)
+    assert torch.equal(U_k, U_k2)
+    assert G2.store.load_spectral(digest, "sym", 3, "SA", torch.float) == (None, None)  # never across precisions
+
+
+def test_store_cheby_coefficients(tmp_path):
+    G = Graph(random_graph(20, 0.3, dtype=torch.double), store=str(tmp_path))
+    c1 = Filter(G, meyer_kernel, order=10).cheby_coefficients
+    flt = Filter(G, meyer_kernel, order=10)
+    name = flt._coeff_name()
+    assert (G.fingerprint(), name) in G.store
+    assert torch.equal(c1, flt.cheby_coefficients)
+    assert Filter(G, lambda x: x, order=10)._coeff_name() is None
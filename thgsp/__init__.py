@@ -5,7 +5,7 @@ import torch
 
 __version__ = '0.1.0'
 
-cpp_tools = ['_version', '_dsatur']
+cpp_tools = ['_version', '_dsatur', '_spmm']
 for tool in cpp_tools:
     torch.ops.load_library(importlib.machinery.PathFinder().find_spec(
         tool, [osp.dirname(__file__)]).origin)
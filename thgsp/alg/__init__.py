@@ -1,5 +1,7 @@
 from .coloring import dsatur
+from .spmm import spmm
 from .traverse import bfs_lil
 
 __all__ = ['dsatur',
+           'spmm',
            'bfs_lil']
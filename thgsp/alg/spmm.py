@@ -0,0 +1,91 @@
+from functools import lru_cache
+
+import torch
+from torch_sparse import SparseTensor
+
+FUSED_DTYPES = (torch.float, torch.double)  # AT_DISPATCH_FLOATING_TYPES of csrc/cpu/spmm_cpu.cpp
+
+
+def spmm_py(adj: SparseTensor, x: torch.Tensor, diag=None, left=None, right=None, prev=None, alpha=1., beta=0.):
+    z = adj @ (x if right is None else right.view(-1, 1) * x)
+    if left is not None:
+        z = left.view(-1, 1) * z
+    if diag is not None:
+        z = z + diag.view(-1, 1) * x
+    if alpha != 1:
+        z = alpha * z
+    if prev is not None:
+        z = z + beta * prev
+    return z
+
+
+def spmm_cpp(adj: SparseTensor, x: torch.Tensor, diag=None, left=None, right=None, prev=None, alpha=1., beta=0.):
+    rowptr, col, value = adj.csr()
+    return torch.ops.torch_gsp.spmm_fused(rowptr, col, value, x, diag, left, right, prev, alpha, beta)  # noqa
+
+
+@lru_cache(maxsize=None)
+def _fused_available() -> bool:
+    """
+    Whether the CPU kernel :obj:`torch.ops.torch_gsp.spmm_fused` is registered.
+    """
+    try:
+        torch.ops.torch_gsp.spmm_fused  # noqa
+    except (AttributeError, RuntimeError):
+        return False
+    return True
+
+
+def _use_fused(adj: SparseTensor, x: torch.Tensor, *tensors) -> bool:
+    tensors = [t for t in (adj.storage.value(),) + tensors if t is not None]
+    if torch.is_grad_enabled() and any(t.requires_grad for t in tensors + [x]):
+        return False
+    if x.dim() != 2 or x.dtype not in FUSED_DTYPES:
+        return False
+    if any(t.device.type != "cpu" for t in tensors + [x, adj.storage.col()]):
+        return False
+    return _fused_available()
+
+
+def spmm(adj: SparseTensor, x: torch.Tensor, diag=None, left=None, right=None, prev=None, alpha=1., beta=0.):
+    r"""
+    The fused sparse-dense multiplication
+
+    .. math::
+        \alpha\left(\text{diag}\odot x+\text{left}\odot A(\text{right}\odot x)\right)+\beta\,\text{prev}
+
+    in a single pass over the rows of :math:`A`, where the vectors :obj:`diag`, :obj:`left` and :obj:`right` scale
+    the rows. E.g., one step :math:`2\tilde{L}T_{k-1}-T_{k-2}` of the Chebyshev recurrence reads and writes every
+    signal only once. It runs the multi-threaded CPU kernel :obj:`torch.ops.torch_gsp.spmm_fused` on float and double
+    CPU tensors if the kernel is registered, and generic :mod:`torch_sparse` operations otherwise, e.g., on GPU or
+    when gradients are required. Errors of the kernel are not caught.
+
+    Parameters
+    ----------
+    adj:    SparseTensor
+        The :obj:`(N,N)` sparse matrix :math:`A`.
+    x:      Tensor
+        Shape: :obj:`(N,)` or :obj:`(N,C)`.
+    diag:   Tensor, optional
+        The :obj:`(N,)` diagonal, zeros if not given.
+    left:   Tensor, optional
+        The :obj:`(N,)` row scales, ones if not given.
+    right:  Tensor, optional
+        The :obj:`(N,)` column scales, ones if not given.
+    prev:   Tensor, optional
+        A tensor of the same shape as :obj:`x`, zeros if not given.
+    alpha:  float
+    beta:   float
+
+    Returns
+    -------
+    Tensor
+        The same shape as :obj:`x`.
+    """
+    if x.dim() == 1:
+        prev = None if prev is None else prev.unsqueeze(-1)
+        return spmm(adj, x.unsqueeze(-1), diag, left, right, prev, alpha, beta).squeeze(-1)
+
+    if _use_fused(adj, x, diag, left, right, prev):
+        return spmm_cpp(adj, x, diag, left, right, prev, alpha, beta)
+    return spmm_py(adj, x, diag, left, right, prev, alpha, beta)
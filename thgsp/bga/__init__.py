@@ -3,7 +3,7 @@ from .greedy import greedy_bga
 from .harary import harary
 from .mfs import amfs
 from .osglm import osglm
-from .utils import graclus_refine_raw, graclus_coarsen
+from .utils import graclus_refine_raw, graclus_coarsen, cached_decomposition
 from .utils import kernel_array_from_beta_dist, beta_dist2channel_name, beta2channel_mask, is_bipartite_fix, laplace
 
 __all__ = ['kernel_array_from_beta_dist',
@@ -18,4 +18,5 @@ __all__ = ['kernel_array_from_beta_dist',
            'admm_lbga_ray',
            'greedy_bga',
            'graclus_coarsen',
-           'graclus_refine_raw']
+           'graclus_refine_raw',
+           'cached_decomposition']
@@ -1,4 +1,5 @@
 import collections
+import copy
 import math
 import random
 
@@ -9,6 +10,11 @@ from torch_cluster import graclus_cluster
 from torch_geometric.nn.pool.pool import pool_edge
 from torch_sparse import SparseTensor
 
+from thgsp.graphs.fingerprint import fingerprint
+
+_decomposition_cache = collections.OrderedDict()
+MAX_CACHED_DECOMPOSITIONS = 32
+
 
 def kernel_array_from_beta_dist(beta_dist, kernel1, kernel2, in_channels=1):
     f1c = np.where(beta_dist, kernel1, kernel2)
@@ -359,3 +365,32 @@ def graclus_refine_raw(assignments, level: int = 1, verbose=False):
             print("[level: {}],  refined cluster:\n{}".format(level, base_cluster))
             print("-----<")
     return base_cluster
+
+
+def cached_decomposition(algorithm, A, **kwargs):
+    """
+    Run the deterministic bipartite decomposition :obj:`algorithm(A, **kwargs)`, e.g. :func:`harary` and
+    :func:`osglm`, memoized by the content fingerprint of :obj:`A`. Hence graph objects with the same topology and
+    weights share one decomposition. The last :obj:`MAX_CACHED_DECOMPOSITIONS` results are kept.
+
+    Returns
+    -------
+    The same as :obj:`algorithm`. Every call gets its own copy of the result, hence in-place modifications never reach
+    the cache or other callers. Calls with unhashable keyword arguments(e.g. an array of vertex colors) are not
+    memoized.
+    """
+    fp = A.fingerprint() if hasattr(A, "fingerprint") else fingerprint(A)
+    key = (algorithm.__module__, algorithm.__qualname__, fp, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return algorithm(A, **kwargs)
+
+    if key in _decomposition_cache:
+        _decomposition_cache.move_to_end(key)
+        return copy.deepcopy(_decomposition_cache[key])
+    result = algorithm(A, **kwargs)
+    _decomposition_cache[key] = copy.deepcopy(result)
+    while len(_decomposition_cache) > MAX_CACHED_DECOMPOSITIONS:
+        _decomposition_cache.popitem(last=False)
+    return result
@@ -1,16 +1,27 @@
-from .approximation import cheby_coeff, cheby_op, polyval, nla, hard_threshold
+from .approximation import cheby_coeff, cheby_op, cheby_clenshaw, polyval, nla, hard_threshold
+from .approximation import cheby_coeff_batch, coeff_cache_info, clear_coeff_cache
+from .coefficients import PackedCoefficients
 from .filter import Filter
+from .krylov import lanczos_filter
 from .kernels import get_kernel_name, get_kernel_id
 from .kernels import ideal_kernel, meyer_mirror_kernel, meyer_kernel
+from .kernels import biorth_kernels, biorth_cache_info, clear_biorth_cache
 from .qmf import QmfCore, ColorQmf, NumQmf, BiorthCore, NumBiorth, ColorBiorth, QmfOperator, BiorthOperator
+from .pyramid import WaveletPyramid
 
 __all__ = ['cheby_op',
+           'cheby_clenshaw',
            'cheby_coeff',
+           'cheby_coeff_batch',
            'polyval',
            'nla',
            'hard_threshold',
+           'lanczos_filter',
+           'coeff_cache_info',
+           'clear_coeff_cache',
 
            'Filter',
+           'PackedCoefficients',
            'QmfCore',
            'ColorQmf',
            'NumQmf',
@@ -20,9 +31,13 @@ __all__ = ['cheby_op',
 
            "QmfOperator",
            "BiorthOperator",
+           'WaveletPyramid',
 
            'ideal_kernel',
            'meyer_kernel',
            'meyer_mirror_kernel',
+           'biorth_kernels',
+           'biorth_cache_info',
+           'clear_biorth_cache',
            'get_kernel_id',
            'get_kernel_name']
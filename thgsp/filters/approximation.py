@@ -1,20 +1,160 @@
+import weakref
+from functools import partial
+
 import numpy as np
 import torch
+import torch.fft
 from scipy.sparse import csr_matrix, eye
+from torch.autograd.function import once_differentiable
 from torch_sparse import SparseTensor
 
+from thgsp.alg.spmm import spmm
+from thgsp.graphs.cache import SpectralCache
+from thgsp.graphs.laplace import LaplacianOperator
+from .coefficients import PackedCoefficients
+
 
 def normalize_laplace(L: SparseTensor, lam_max: float = 2.):
     Ln = L.clone()
     row, col, val = Ln.coo()
     diag_mask = row == col
+    if isinstance(lam_max, torch.Tensor):  # per node
+        lam_max = lam_max[row]
     val[...] = (2. * val) / lam_max
     val.masked_fill_(val == float('inf'), 0)
     val[diag_mask] -= 1
     return Ln
 
 
-def cheby_op(x: torch.Tensor, L: SparseTensor, coeff: torch.Tensor, lam_max: float = 2.):
+# id(L) --> (weak reference to L, {lam_max: rescaled L})
+_scaled_laplacians = {}
+
+
+def scaled_laplace(L, lam_max: float = 2.):
+    r"""
+    The rescaled Laplacian :math:`2L/\lambda_{max}-I` for Chebyshev approximation, memoized per :obj:`(L, lam_max)`
+    for as long as :obj:`L` is alive. Hence repeated :func:`cheby_op` calls on the same Laplacian do not clone and
+    rewrite it every time.
+
+    The memo is bypassed when gradients w.r.t. :obj:`L` are tracked or :obj:`lam_max` is a tensor, and it is not aware
+    of in-place modifications of :obj:`L`.
+
+    Parameters
+    ----------
+    L:  SparseTensor, LaplacianOperator
+    lam_max:    float, Tensor
+        The maximal graph frequency, or an :obj:`(N,)` tensor of that of the graph every node belongs to, e.g., in a
+        :class:`thgsp.graphs.GraphBatch` whose Laplacian is block-diagonal.
+
+    Returns
+    -------
+    SparseTensor, LaplacianOperator
+        The same type as :obj:`L`.
+    """
+    if isinstance(L, LaplacianOperator):
+        requires_grad = L.adj.requires_grad() or L.deg.requires_grad
+        normalize = L.normalize
+    else:
+        requires_grad = L.requires_grad()
+        normalize = partial(normalize_laplace, L)
+    if (requires_grad and torch.is_grad_enabled()) or isinstance(lam_max, torch.Tensor):
+        return normalize(lam_max)
+
+    key = id(L)
+    entry = _scaled_laplacians.get(key)
+    if entry is None or entry[0]() is not L:
+        try:
+            ref = weakref.ref(L, lambda _, k=key: _scaled_laplacians.pop(k, None))
+        except TypeError:  # not weak-referable
+            return normalize(lam_max)
+        entry = (ref, {})
+        _scaled_laplacians[key] = entry
+    scaled = entry[1]
+    if lam_max not in scaled:
+        scaled[lam_max] = normalize(lam_max)
+    return scaled[lam_max]
+
+
+def cheby_step(L_norm, x: torch.Tensor, prev: torch.Tensor = None):
+    r"""
+    One step :math:`2\tilde{L}x-prev` of the Chebyshev recurrence, or :math:`\tilde{L}x` if :obj:`prev` is
+    :obj:`None`, fused into a single pass over the sparse matrix by :func:`thgsp.alg.spmm`.
+    """
+    alpha = 1. if prev is None else 2.
+    if isinstance(L_norm, LaplacianOperator):
+        return L_norm.matmul(x, prev, alpha, -1.)
+    return spmm(L_norm, x, prev=prev, alpha=alpha, beta=-1.)
+
+
+class ChebyOp(torch.autograd.Function):
+    r"""
+    Chebyshev approximation of graph filtering whose backward pass recomputes the basis :math:`T_k(\tilde{L})x`
+    instead of storing it. Only :math:`x`, :math:`T_{K-1}(\tilde{L})x` and :math:`T_K(\tilde{L})x` are saved, and
+    the basis is regenerated in the reverse order by :math:`T_{k-2}=2\tilde{L}T_{k-1}-T_k` while the adjoints run the
+    transposed recurrence :math:`a_k=c_kg+2\tilde{L}^\top a_{k+1}-a_{k+2}`. Hence the memory of backward does not
+    grow with the order :math:`K` at the cost of about twice the sparse multiplications of the plain autograd.
+
+    Gradients are propagated to the signals, the coefficients and the nonzeros of :math:`\tilde{L}`. See
+    :func:`cheby_op` with :obj:`memory_efficient=True`.
+    """
+
+    @staticmethod
+    def forward(ctx, x, coeff, value, L_norm):
+        K = coeff.size(-1) - 1
+        c = coeff.unsqueeze(1)  # Co x 1 x Ci x K+1
+        result = 0.5 * c[..., 0] * x
+        t_old, t_cur = None, x
+        for k in range(1, K + 1):
+            t_new = cheby_step(L_norm, t_cur, t_old)  # t_old is None for k=1
+            result.addcmul_(c[..., k], t_new)
+            t_old, t_cur = t_cur, t_new
+        ctx.L_norm = L_norm
+        ctx.save_for_backward(x, coeff, t_old, t_cur)
+        return result
+
+    @staticmethod
+    @once_differentiable
+    def backward(ctx, grad):
+        x, coeff, t_old, t_cur = ctx.saved_tensors
+        L_norm = ctx.L_norm
+        need_x, need_c, need_v = ctx.needs_input_grad[:3]
+        K = coeff.size(-1) - 1
+        c = coeff.unsqueeze(1)
+        shared = x.dim() == 2  # the basis is shared by all output channels
+        row, col, value = L_norm.coo()
+        L_t = L_norm.t() if need_x or need_v else None
+
+        grad_c = torch.empty_like(coeff) if need_c else None
+        grad_v = torch.zeros_like(value) if need_v else None
+        a_next = a_next2 = None  # the adjoints of T_{k+1}x and T_{k+2}x
+        t_k, t_km1 = t_cur, t_old  # T_k x and T_{k-1}x
+        for k in range(K, -1, -1):
+            if need_c:
+                grad_c[..., k] = (grad * t_k).sum(-2)
+            if need_x or need_v:
+                a = (0.5 * c[..., 0] if k == 0 else c[..., k]) * grad
+                a = a.sum(0) if shared else a
+                if a_next is not None:  # T_1 = L T_0 whereas T_k = 2L T_{k-1} - T_{k-2}
+                    a.add_(L_t @ a_next, alpha=2 if k > 0 else 1)
+                if a_next2 is not None:
+                    a.sub_(a_next2)
+                if need_v and k >= 1:
+                    edge = a.index_select(-2, row) * t_km1.index_select(-2, col)
+                    edge = edge.sum(-1) if shared else edge.sum((0, 2))
+                    grad_v.add_(edge, alpha=2 if k >= 2 else 1)
+                a_next2, a_next = a_next, a
+            if k >= 2:
+                t_km2 = x if k == 2 else cheby_step(L_norm, t_km1, t_k)
+                t_k, t_km1 = t_km1, t_km2
+            else:
+                t_k, t_km1 = x, None
+        if need_c:
+            grad_c[..., 0] *= 0.5
+        return a_next if need_x else None, grad_c, grad_v, None
+
+
+def cheby_op(x: torch.Tensor, L, coeff: torch.Tensor, lam_max: float = 2., memory_efficient: bool = False,
+             damping=None, index: torch.Tensor = None):
     """ Chebyshev approximation of graph filtering
 
     Parameters
@@ -22,48 +162,199 @@ def cheby_op(x: torch.Tensor, L: SparseTensor, coeff: torch.Tensor, lam_max: flo
     x:          Tensor
         The input graph signal. It's shape can be either :obj:`(N,)` , :obj:`(N,Ci)` or :obj:`(Co,N,Ci)`, wherein
         :obj:`N`, :obj:`Ci` and :obj:`Co` are the numbers of nodes, input channels, and output channels respectively.
-    L:          SparseTensor
-        The :obj:`(N,N)` Laplacian matrix.
+    L:          SparseTensor, LaplacianOperator
+        The :obj:`(N,N)` Laplacian matrix, or its matrix-free :class:`LaplacianOperator` which saves the memory of
+        materializing and rescaling it.
     coeff:      Tensor
         The :obj:`(Co,Ci,K+1)` Chebyshev coefficients for :obj:`Ci*Co` kernels, wherein :obj:`K` is the order of
-        approximation.
-    lam_max:    float,optional
-        The maximal graph frequency, i.e., :math:`\lambda_{max}`
+        approximation, or the :obj:`(B,Co,Ci,K+1)` ones of :obj:`B` groups of nodes given by :obj:`index`, e.g., of
+        the graphs of a :class:`thgsp.graphs.GraphBatch` which have distinct :obj:`lam_max`.
+    lam_max:    float,Tensor,optional
+        The maximal graph frequency, i.e., :math:`\lambda_{max}`, or an :obj:`(N,)` tensor of that of every node, see
+        :func:`scaled_laplace`.
+    index:      LongTensor,optional
+        The :obj:`(N,)` group of every node, i.e., the row of :obj:`coeff` it is filtered with, see
+        :func:`cheby_recurrence`.
+    memory_efficient:   bool,optional
+        If True and gradients are required, use :class:`ChebyOp` whose backward recomputes the Chebyshev basis
+        rather than keeping all :obj:`K` intermediate signals alive, which makes learning edge weights on large
+        graphs with high orders affordable. A :class:`LaplacianOperator` is materialized in this case. Ignored for
+        coefficients of every node or group.
+    damping:    str,optional
+        :obj:`"jackson"` or :obj:`"lanczos"` to damp the given(undamped) coefficients, see :func:`cheby_damping`.
 
     Returns
     -------
     Tensor
-        The filtered signals of shape :obj:`(Co,N,Ci)`
+        The filtered signals of shape :obj:`(Co,N,Ci)`.
     """
-    Co, Ci, K = coeff.shape
+    Co, Ci, K = coeff.shape[-3:]
     N = L.size(-1)
 
     if x.dim() == 1:
         assert x.size() == (N,)
-        x = x[None, ..., None]  # (N,) --> 1 x N x 1
-    elif x.dim() == 2:  # N x Ci --> Co x N x Ci
+        x = x[..., None]  # (N,) --> N x 1
+    elif x.dim() == 2:  # N x Ci
         assert x.size() == (N, Ci)
-        x = x.unsqueeze(0)
-    elif x.dim() == 3:  # Co x N x Ci
-        assert x.size() == (Co, N, Ci) or (1, N, Ci)
+    elif x.dim() == 3:  # Co x N x Ci or 1 x N x Ci
+        assert x.size() in ((Co, N, Ci), (1, N, Ci))
+        if x.size(0) == 1:
+            x = x[0]
     else:
         raise RuntimeError("The input signals has mismatched dimensions: {}".format(x.size()))
 
+    coeff = cheby_trim(coeff)  # e.g., truncated by cheby_truncate
+    if damping is not None:
+        coeff = coeff * cheby_damping(coeff.size(-1) - 1, damping, coeff.dtype, coeff.device)
+    L_norm = scaled_laplace(L, lam_max)
+    if memory_efficient and coeff.dim() == 3 and torch.is_grad_enabled():
+        if isinstance(L_norm, LaplacianOperator):
+            L_norm = L_norm.to_sparse_tensor()
+        value = L_norm.storage.value()
+        if x.requires_grad or coeff.requires_grad or (value is not None and value.requires_grad):
+            return ChebyOp.apply(x, coeff, value, L_norm)
+
+    if x.dim() == 3:  # Co x N x Ci --> N x Co x Ci, the node-major layout of cheby_recurrence
+        x = x.permute(1, 0, 2)
+    return cheby_recurrence(x, L_norm, coeff, index=index).permute(1, 0, 2).contiguous()  # N x Co x Ci --> Co x N x Ci
+
+
+def cheby_recurrence(x: torch.Tensor, L_norm, coeff: torch.Tensor, left: torch.Tensor = None,
+                     right: torch.Tensor = None, index: torch.Tensor = None):
+    r"""
+    The three-term Chebyshev recurrence on signals in the node-major layout, the workhorse of :func:`cheby_op`.
+
+    A 2D :obj:`x` is shared by all :obj:`Co` output channels, and so is the basis :math:`T_k(\tilde{L})x`. A 3D
+    :obj:`x` is flattened into one :obj:`(N,Co*Ci)` block. Either way, every step of the recurrence is a single
+    multi-RHS sparse multiplication instead of a batched one over :obj:`Co`, and every :math:`T_k(\tilde{L})x` is
+    contracted with the :obj:`(Co,Ci)` coefficients of order :obj:`k`.
+
+    Parameters
+    ----------
+    x:  Tensor
+        Shape: :obj:`(N,Ci)` or :obj:`(N,Co,Ci)`.
+    L_norm: SparseTensor, LaplacianOperator
+        The rescaled Laplacian :math:`\tilde{L}=2L/\lambda_{max}-I`, see :func:`scaled_laplace`.
+    coeff:  Tensor
+        The :obj:`(Co,Ci,K+1)` Chebyshev coefficients, the :obj:`(N,Co,Ci,K+1)` ones of every node, or the
+        :obj:`(B,Co,Ci,K+1)` ones of :obj:`B` groups of nodes given by :obj:`index`. :obj:`K` may be zero, i.e.,
+        :math:`c_0x/2`.
+    left:   Tensor, optional
+        An :obj:`(N,)` diagonal scaling of the result, applied in-place after the last step.
+    right:  Tensor, optional
+        An :obj:`(N,)` diagonal scaling of :obj:`x`, fused into the copy of :obj:`x` that starts the recurrence.
+        Hence :math:`\mathrm{diag}(left)\,f(L)\,\mathrm{diag}(right)\,x` costs no extra pass over the signals.
+    index:  LongTensor, optional
+        The :obj:`(N,)` group of every node. The coefficients of order :obj:`k` are gathered for the nodes at the
+        :obj:`k`-th step, hence the :obj:`(N,Co,Ci,K+1)` coefficients of every node are never materialized.
+
+    Returns
+    -------
+    Tensor
+        The filtered signals of shape :obj:`(N,Co,Ci)`.
+    """
+    Co, Ci, K = coeff.shape[-3:]
+    N = x.size(0)
     K = K - 1
-    c = coeff.unsqueeze(1)  # Co x Ci x K --> Co x 1 x Ci x K
-    L_norm = normalize_laplace(L, lam_max)
-    twf_old = x
-    twf_cur = L_norm @ x  # Co x N x Ci
-    result = 0.5 * c[..., 0] * twf_old + c[..., 1] * twf_cur
+    view = (N, 1, Ci) if x.dim() == 2 else (N, Co, Ci)
+    twf_old = x.reshape(N, -1)  # N x Ci or N x Co*Ci, copied only if x is not contiguous
+    if right is not None:
+        twf_old = twf_old * right.unsqueeze(-1)
+    if index is None:
+        def order(k):
+            return coeff[..., k]
+    else:
+        def order(k):
+            return coeff[..., k].index_select(0, index)  # B x Co x Ci --> N x Co x Ci
+    result = 0.5 * order(0) * twf_old.view(view)  # N x Co x Ci
+    if K > 0:
+        twf_cur = cheby_step(L_norm, twf_old)
+        result.addcmul_(order(1), twf_cur.view(view))
     for k in range(2, K + 1):
-        twf_new = 2 * (L_norm @ twf_cur) - twf_old
-        result = result + c[..., k] * twf_new
+        twf_new = cheby_step(L_norm, twf_cur, twf_old)
+        result.addcmul_(order(k), twf_new.view(view))
         twf_old = twf_cur
         twf_cur = twf_new
 
+    if left is not None:
+        result.mul_(left.view(-1, 1, 1))
     return result
 
 
+def cheby_clenshaw(x: torch.Tensor, L, coeff: torch.Tensor, lam_max: float = 2., out: torch.Tensor = None,
+                   workspace=None):
+    r"""
+    Chebyshev approximation of graph filtering by the Clenshaw recurrence
+
+    .. math::
+        b_k = c_kx + 2\tilde{L}b_{k+1} - b_{k+2},\quad y = \frac{c_0}{2}x + \tilde{L}b_1 - b_2,
+
+    where :math:`\tilde{L}=2L/\lambda_{max}-I` and :math:`b_{K+1}=b_{K+2}=0`. The recurrence works in two
+    preallocated ping-pong buffers updated in-place, hence the peak memory is about three :obj:`(Co,N,Ci)` signals(the
+    two buffers plus the output of one sparse multiplication) whatever the order :obj:`K` is. Unlike :func:`cheby_op`,
+    the basis cannot be shared across output channels, and autograd is not supported.
+
+    Parameters
+    ----------
+    x:          Tensor
+        The input graph signal of shape :obj:`(N,)` , :obj:`(N,Ci)` or :obj:`(Co,N,Ci)`.
+    L:          SparseTensor, LaplacianOperator
+        The :obj:`(N,N)` Laplacian matrix.
+    coeff:      Tensor
+        The :obj:`(Co,Ci,K+1)` Chebyshev coefficients.
+    lam_max:    float,optional
+        The maximal graph frequency.
+    out:        Tensor, optional
+        The :obj:`(Co,N,Ci)` output tensor.
+    workspace:  tuple, optional
+        Two :obj:`(Co,N,Ci)` tensors as the ping-pong buffers, which are reusable across calls.
+
+    Returns
+    -------
+    Tensor
+        The filtered signals of shape :obj:`(Co,N,Ci)`, i.e., :obj:`out` if given.
+    """
+    coeff = cheby_trim(coeff)
+    Co, Ci, K = coeff.shape
+    N = L.size(-1)
+    K = K - 1
+    if x.dim() == 1:
+        x = x[..., None]
+    if x.dim() == 2:
+        x = x.unsqueeze(0)
+    assert x.size() in ((Co, N, Ci), (1, N, Ci))
+    if torch.is_grad_enabled() and (x.requires_grad or coeff.requires_grad):
+        raise RuntimeError("cheby_clenshaw does not support autograd, use cheby_op instead")
+
+    shape = (Co, N, Ci)
+    c = coeff.unsqueeze(1)  # Co x 1 x Ci x K+1
+    if workspace is None:
+        b1, b2 = x.new_empty(shape), x.new_empty(shape)
+    else:
+        b1, b2 = workspace
+        assert b1.shape == shape and b2.shape == shape
+        if out is None:
+            out = x.new_empty(shape)
+
+    if K == 0:
+        out = b1 if out is None else out
+        return torch.mul(x, 0.5 * c[..., 0], out=out)
+
+    L_norm = scaled_laplace(L, lam_max)
+    torch.mul(x, c[..., K], out=b1)  # b_K
+    b2.zero_()  # b_{K+1}
+    for k in range(K - 1, 0, -1):
+        # b_{k+2} --> b_k = c_k x + 2 L b_{k+1} - b_{k+2}, in-place
+        b2.neg_().add_(L_norm @ b1, alpha=2).addcmul_(c[..., k], x)
+        b1, b2 = b2, b1
+    if out is None:
+        out = b2
+        out.neg_().add_(L_norm @ b1)
+    else:
+        torch.sub(L_norm @ b1, b2, out=out)
+    return out.addcmul_(0.5 * c[..., 0], x)
+
+
 def cheby_op_basis(L: csr_matrix, coeff: torch.Tensor, lam_max=2.):
     Co, K = coeff.shape
     K = K - 1
@@ -91,36 +382,367 @@ def cheby_op_basis(L: csr_matrix, coeff: torch.Tensor, lam_max=2.):
     return Hl.astype(dt), Hh.astype(dt)
 
 
-def cheby_coeff(kernels, K=10, lam_max=2., num_points=None, dtype=None, device=None):
+def sparse_truncate(A: SparseTensor, tol: float = 0., max_nnz: int = None) -> SparseTensor:
+    """
+    Drop the entries of :obj:`A` whose magnitudes are no larger than :obj:`tol`, and keep at most the :obj:`max_nnz`
+    largest(in magnitude) entries of every row.
+    """
+    row, col, val = A.coo()
+    keep = val.abs() > tol
+    if max_nnz is not None and val.numel() > 0:
+        # sort by row, then by the descending magnitude within every row
+        mag = val.abs()
+        key = row.to(torch.double) * 2 + (1 - mag.to(torch.double) / mag.max().clamp_min(1e-300))
+        order = key.argsort()
+        rowptr, _, _ = A.csr()
+        rank = torch.empty_like(order)
+        rank[order] = torch.arange(order.numel(), device=order.device) - rowptr[row[order]]
+        keep &= rank < max_nnz
+    return SparseTensor(row=row[keep], col=col[keep], value=val[keep], sparse_sizes=A.sizes(), is_sorted=True)
+
+
+def _sparse_sum(*terms) -> SparseTensor:
+    # the sum of (scale, SparseTensor) terms, wherein a scale is a float or an (N,) tensor scaling rows
+    rows, cols, vals = [], [], []
+    for scale, A in terms:
+        row, col, val = A.coo()
+        rows.append(row)
+        cols.append(col)
+        vals.append(val * (scale[row] if isinstance(scale, torch.Tensor) and scale.dim() == 1 else scale))
+    return SparseTensor(row=torch.cat(rows), col=torch.cat(cols), value=torch.cat(vals),
+                        sparse_sizes=terms[0][1].sizes()).coalesce()
+
+
+def cheby_op_basis_sparse(L: SparseTensor, coeff: torch.Tensor, lam_max: float = 2., tol: float = 0.,
+                          max_nnz: int = None) -> SparseTensor:
+    r"""
+    The explicit sparse matrix :math:`\sum_k\mathrm{diag}(c_k)T_k(\tilde{L})` of Chebyshev approximation, which is
+    a torch-native counterpart of :func:`cheby_op_basis` built by sparse-sparse products. The fill-in of
+    :math:`T_k(\tilde{L})` grows with :math:`k` toward a dense matrix, hence every :math:`T_k` is truncated by
+    :func:`sparse_truncate` with :obj:`tol` and :obj:`max_nnz` before it enters the recurrence, and so is the sum.
+
+    Parameters
+    ----------
+    L:  SparseTensor
+        The :obj:`(N,N)` Laplacian.
+    coeff:  Tensor
+        The :obj:`(K+1,)` coefficients, or the :obj:`(N,K+1)` ones of every row.
+    lam_max:    float
+    tol:    float
+        The magnitude below which entries are dropped.
+    max_nnz:    int, optional
+        The maximal number of nonzeros per row.
+
+    Returns
+    -------
+    SparseTensor
+        The :obj:`(N,N)` operator.
+    """
+    K = coeff.size(-1) - 1
+    N = L.size(0)
+    coeff = coeff.to(L.dtype())
+    c = coeff.t() if coeff.dim() == 2 else coeff  # K+1 x N or K+1
+    Ln = sparse_truncate(normalize_laplace(L, lam_max))
+    t_old = SparseTensor.eye(N, dtype=L.dtype(), device=L.device())
+    t_cur = Ln
+    H = _sparse_sum((0.5 * c[0], t_old), (c[1], t_cur))
+    for k in range(2, K + 1):
+        t_new = sparse_truncate(_sparse_sum((2., Ln @ t_cur), (-1., t_old)), tol, max_nnz)
+        H = _sparse_sum((1., H), (c[k], t_new))
+        t_old, t_cur = t_cur, t_new
+    return sparse_truncate(H, tol, max_nnz)
+
+
+# (kernel, K, lam_max, num_points, dtype, device) --> the (K+1,) Chebyshev coefficients of the kernel
+COEFF_CACHE_BYTES = 64 * 2 ** 20
+_coeff_cache = SpectralCache(COEFF_CACHE_BYTES)
+
+
+def cheby_coeff(kernels, K=10, lam_max=2., num_points=None, dtype=None, device=None, damping=None):
+    r"""
+    The Chebyshev coefficients of kernels. The coefficients of every kernel object are kept in a process-wide LRU
+    cache keyed by the kernel itself, :obj:`K`, :obj:`lam_max`, :obj:`num_points`, :obj:`dtype` and :obj:`device`,
+    which assumes kernels are pure functions. See :func:`coeff_cache_info` and :func:`clear_coeff_cache`.
+
+    Parameters
+    ----------
+    kernels:    array, callable
+        The :obj:`(M,Co,Ci)` array of kernels, or a single kernel.
+    K:  int
+        The order of approximation.
+    lam_max:    float
+        The maximal graph frequency.
+    num_points: int, optional
+        The number of Chebyshev nodes, :obj:`K+1` if not given.
+    damping:    str, optional
+        :obj:`"jackson"` or :obj:`"lanczos"` to damp the coefficients, see :func:`cheby_damping`.
+
+    Returns
+    -------
+    Tensor
+        Shape: :obj:`(M,Co,Ci,K+1)`.
+    """
     if num_points is None:
         num_points = K + 1
     assert lam_max > 0
 
-    if isinstance(kernels, np.ndarray):
-        M, Co, Ci = kernels.shape
-    else:  # pass only a single kernel function
+    if not isinstance(kernels, np.ndarray):  # pass only a single kernel function
         kernels = np.array([[[kernels]]])  # 1 x 1 x 1 array
-        M = Co = Ci = 1
 
     points = np.pi * (torch.arange(num_points, dtype=dtype,
                                    device=device) + 0.5) / num_points
+    x = lam_max / 2 * (torch.cos(points) + 1)
+    unique, inverse = unique_kernels(kernels)
+    keys = [(krn, K, float(lam_max), num_points, points.dtype, points.device) for krn in unique]
+
+    coeff = points.new_empty(len(unique), K + 1)
+    missing = []
+    for u, key in enumerate(keys):
+        try:
+            cached = _coeff_cache.get(key)
+        except TypeError:  # unhashable kernels are never cached
+            cached = None
+        if cached is None:
+            missing.append(u)
+        else:
+            coeff[u] = cached
+    if len(missing) > 0:
+        gs = x.new_empty(len(missing), num_points)
+        for i, u in enumerate(missing):
+            gs[i] = unique[u](x)
+        computed = cheby_dct(gs, K)
+        coeff[missing] = computed
+        if not computed.requires_grad:  # learnable kernels are not cached
+            for i, u in enumerate(missing):
+                try:
+                    _coeff_cache.put(keys[u], computed[i].clone())
+                except TypeError:
+                    pass
+    if damping is not None:
+        coeff = coeff * cheby_damping(K, damping, coeff.dtype, coeff.device)
+    inverse = torch.as_tensor(inverse, device=coeff.device)
+    return coeff[inverse].view(*kernels.shape, K + 1)  # M x Co x Ci x K+1
+
+
+def cheby_coeff_batch(kernels, K=10, lam_max=None, num_points=None, damping=None):
+    r"""
+    The Chebyshev coefficients of kernels for a batch of graphs with distinct maximal graph frequencies. All kernels
+    are evaluated at the Chebyshev nodes of all graphs in one call each, and the coefficients are computed by one
+    batched :func:`cheby_dct`. Unlike :func:`cheby_coeff`, nothing is cached.
+
+    Parameters
+    ----------
+    kernels:    array, callable
+        The :obj:`(M,Co,Ci)` array of kernels, or a single kernel.
+    K:  int
+        The order of approximation.
+    lam_max:    Tensor
+        The :obj:`(B,)` maximal graph frequencies, whose data type and device are those of the coefficients.
+    num_points: int, optional
+        The number of Chebyshev nodes, :obj:`K+1` if not given.
+    damping:    str, optional
+        :obj:`"jackson"` or :obj:`"lanczos"` to damp the coefficients, see :func:`cheby_damping`.
+
+    Returns
+    -------
+    Tensor
+        Shape: :obj:`(B,M,Co,Ci,K+1)`.
+    """
+    if num_points is None:
+        num_points = K + 1
+    lam_max = torch.as_tensor(lam_max)
+    assert lam_max.dim() == 1 and (lam_max > 0).all()
+
+    if not isinstance(kernels, np.ndarray):  # pass only a single kernel function
+        kernels = np.array([[[kernels]]])  # 1 x 1 x 1 array
+
+    points = np.pi * (torch.arange(num_points, dtype=lam_max.dtype, device=lam_max.device) + 0.5) / num_points
+    x = lam_max.unsqueeze(-1) / 2 * (torch.cos(points) + 1)  # B x P
+    gs = evaluate_kernels(kernels, x.view(-1)).view(*kernels.shape, *x.shape)  # M x Co x Ci x B x P
+    coeff = cheby_dct(gs, K)  # M x Co x Ci x B x K+1
+    if damping is not None:
+        coeff = coeff * cheby_damping(K, damping, coeff.dtype, coeff.device)
+    return coeff.permute(3, 0, 1, 2, 4)
+
+
+def coeff_cache_info() -> dict:
+    """
+    The statistics of the process-wide cache of Chebyshev coefficients, see :meth:`thgsp.graphs.SpectralCache.info`.
+    """
+    return _coeff_cache.info()
+
+
+def clear_coeff_cache():
+    _coeff_cache.clear()
+
+
+def cheby_dct(gs: torch.Tensor, K: int) -> torch.Tensor:
+    r"""
+    The Chebyshev coefficients :math:`c_k=\frac{2}{P}\sum_j g(x_j)\cos(k\theta_j)`, :math:`k=0,\dots,K`, from
+    the kernel values at the :obj:`P` Chebyshev nodes :math:`\theta_j=\pi(j+0.5)/P`, which form a DCT-II computed
+    by an FFT of length :obj:`2P` in :math:`O(P\log P)` per kernel. An explicit cosine matrix is used if
+    :obj:`K+1>P`.
+
+    Parameters
+    ----------
+    gs: Tensor
+        Shape: :obj:`(...,P)`.
+    K:  int
+        The order of approximation.
+
+    Returns
+    -------
+    Tensor
+        Shape: :obj:`(...,K+1)`.
+    """
+    P = gs.size(-1)
+    orders = torch.arange(K + 1, dtype=gs.dtype, device=gs.device)
+    if K + 1 > P:
+        points = np.pi * (torch.arange(P, dtype=gs.dtype, device=gs.device) + 0.5) / P
+        return gs @ torch.cos(points.unsqueeze(-1) * orders) * 2. / P
+    # DCT-II: Re(e^{-i*pi*k/2P} * FFT([g, flip(g)])_k) = 2 * sum_j g_j cos(pi*k*(2j+1)/2P)
+    spectrum = torch.fft.rfft(torch.cat([gs, gs.flip(-1)], -1))[..., :K + 1]
+    phase = np.pi * orders / (2 * P)
+    return (spectrum.real * torch.cos(phase) + spectrum.imag * torch.sin(phase)) / P
+
+
+def unique_kernels(kernels):
+    """
+    The distinct kernel objects(by :func:`id`) of an array of kernels.
+
+    Returns
+    -------
+    unique: list
+        The distinct kernels.
+    inverse:    array
+        The indices into :obj:`unique` of the flattened :obj:`kernels`.
+    """
+    ids = np.array([id(krn) for krn in kernels.flat])
+    _, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+    flat_kernels = kernels.reshape(-1)
+    return [flat_kernels[i] for i in first], inverse.reshape(-1)
+
+
+def evaluate_kernels(kernels, x: torch.Tensor) -> torch.Tensor:
+    """
+    Evaluate an :obj:`(M,Co,Ci)` array of kernels at the points :obj:`x`. Every distinct kernel object(by
+    :func:`id`) is evaluated only once, and the responses are then gathered into place in a single batch.
+
+    Returns
+    -------
+    Tensor
+        Shape: :obj:`(M,Co,Ci,P)`, wherein :obj:`P` is the number of points.
+    """
+    if not isinstance(kernels, np.ndarray):
+        kernels = np.array([[[kernels]]])
+    unique, inverse = unique_kernels(kernels)
+    responses = x.new_empty(len(unique), x.numel())
+    for u, krn in enumerate(unique):
+        responses[u] = krn(x)
+    inverse = torch.as_tensor(inverse, device=x.device)
+    return responses[inverse].view(*kernels.shape, x.numel())
+
 
-    gs = torch.zeros(M, Co, Ci, 1, num_points, dtype=dtype, device=device)
-    kernel_cache = dict()
-    for m in range(M):
-        for i in range(Ci):
-            for j in range(Co):
-                krn = kernels[m, j, i]
-                kid = id(krn)
-                if kid in kernel_cache:
-                    gs[m, j, i] = kernel_cache[kid]
-                else:  # kernel_cache stores the reference to a part of memory used by gs.
-                    gs[m, j, i] = krn(lam_max / 2 * (torch.cos(points) + 1))
-                    kernel_cache[kid] = gs[m, j, i]
-    order_cos = torch.arange(K + 1, dtype=dtype, device=device).reshape(1, -1) * points.reshape(-1, 1)
-    order_cos.cos_()  # num x K+1
-    coeff = (gs @ order_cos) * 2. / num_points  # M x Co x Ci x 1 x K+1
-    return coeff.squeeze_(-2)  # M x Co x Ci x K+1
+# the order at which coefficients are computed before truncation when the order is "auto"
+MAX_AUTO_ORDER = 128
+
+
+def cheby_truncate(coeff: torch.Tensor, kernels, lam_max: float = 2., tol: float = 1e-6, num_points: int = 1000,
+                   damping=None):
+    r"""
+    Truncate the Chebyshev series of every kernel to the smallest order whose maximal approximation error on a dense
+    uniform grid over :math:`[0,\lambda_{max}]` is no larger than :obj:`tol`. The coefficients beyond are zeroed,
+    which :func:`cheby_op` skips if all kernels agree.
+
+    Parameters
+    ----------
+    coeff:  Tensor
+        The undamped :obj:`(M,Co,Ci,K+1)` coefficients given by :func:`cheby_coeff`.
+    kernels:    array, callable
+        The :obj:`(M,Co,Ci)` kernels approximated by :obj:`coeff`.
+    lam_max:    float
+        The maximal graph frequency.
+    tol:    float
+        The tolerance of the maximal absolute error.
+    num_points: int
+        The number of grid points.
+    damping:    str, optional
+        If given, the error of every order :obj:`k` is measured with the damping factors of order :obj:`k`, and the
+        returned coefficients are damped accordingly, see :func:`cheby_damping`.
+
+    Returns
+    -------
+    coeff:  Tensor
+        The truncated :obj:`(M,Co,Ci,K+1)` coefficients.
+    orders: Tensor
+        The :obj:`(M,Co,Ci)` orders of kernels, which are :obj:`K` for kernels not reaching :obj:`tol`.
+    """
+    K = coeff.size(-1) - 1
+    x = torch.linspace(0, lam_max, num_points, dtype=coeff.dtype, device=coeff.device)
+    gs = evaluate_kernels(kernels, x).to(coeff.dtype)  # M x Co x Ci x P
+    theta = torch.acos((2. / lam_max * x - 1).clamp_(-1, 1))
+    basis = torch.cos(torch.arange(K + 1, dtype=coeff.dtype, device=coeff.device).unsqueeze(-1) * theta)  # K+1 x P
+    basis[0] *= 0.5
+
+    orders = torch.full(coeff.shape[:-1], K, dtype=torch.long, device=coeff.device)
+    approx = torch.zeros_like(gs)  # partial sums of the undamped series, M x Co x Ci x P
+    for k in range(K + 1):
+        if damping is None:
+            approx.add_(coeff[..., k:k + 1] * basis[k])
+        else:  # damping factors change with the order, hence the whole series
+            approx = (coeff[..., :k + 1] * cheby_damping(k, damping, coeff.dtype, coeff.device)) @ basis[:k + 1]
+        err = (approx - gs).abs().max(-1)[0]
+        orders = torch.where((err <= tol) & (orders == K), orders.new_tensor(k), orders)
+
+    mask = torch.arange(K + 1, device=coeff.device) > orders.unsqueeze(-1)
+    truncated = coeff.masked_fill(mask, 0)
+    if damping is not None:
+        for k in orders.unique().tolist():
+            selected = orders == k
+            truncated[selected, :k + 1] *= cheby_damping(k, damping, coeff.dtype, coeff.device)
+    return truncated, orders
+
+
+def cheby_damping(K: int, damping=None, dtype=None, device=None) -> torch.Tensor:
+    r"""
+    The factors :math:`g_k, k=0,\dots,K` multiplying the Chebyshev coefficients of order :obj:`K` to suppress the
+    Gibbs oscillation of kernels with sharp transitions, e.g., :func:`ideal_kernel` and :func:`meyer_kernel`. The
+    approximation becomes slightly smoother but no longer overshoots, and so reaches a given error with a lower order.
+
+    Parameters
+    ----------
+    K:  int
+        The order of approximation.
+    damping:    str, optional
+        :obj:`None`: no damping, all factors are one.
+        :obj:`"jackson"`: the Jackson kernel
+        :math:`g_k=\frac{(K+2-k)\cos(\frac{\pi k}{K+2})+\sin(\frac{\pi k}{K+2})\cot(\frac{\pi}{K+2})}{K+2}`.
+        :obj:`"lanczos"`: the Lanczos :math:`\sigma` factors :math:`g_k=\mathrm{sinc}(\frac{k}{K+1})`.
+
+    Returns
+    -------
+    Tensor
+        Shape: :obj:`(K+1,)`.
+    """
+    k = torch.arange(K + 1, dtype=dtype, device=device)
+    if damping is None:
+        return torch.ones_like(k)
+    if damping == "jackson":
+        a = np.pi / (K + 2)
+        return ((K + 2 - k) * torch.cos(a * k) + torch.sin(a * k) / np.tan(a)) / (K + 2)
+    if damping == "lanczos":
+        t = np.pi * k[1:] / (K + 1)
+        return torch.cat([k.new_ones(1), torch.sin(t) / t])
+    raise ValueError("damping should be one of None, 'jackson' and 'lanczos', but got {}".format(damping))
+
+
+def cheby_trim(coeff: torch.Tensor) -> torch.Tensor:
+    """
+    Drop the trailing orders whose coefficients are zero for all kernels, keeping at least order 1.
+    """
+    nonzero = (coeff != 0).reshape(-1, coeff.size(-1)).any(0).nonzero()
+    K = nonzero.max().item() if nonzero.numel() > 0 else 0
+    return coeff[..., :max(K, 1) + 1]
 
 
 def polyval(c, x):
@@ -150,6 +772,8 @@ def polyval(c, x):
 
 
 def nla(x, frac=0.4, k=None, scheme='abs'):
+    if isinstance(x, PackedCoefficients):
+        return _packed_nla(x, frac, k, scheme)
     Co, N, Ci = x.shape
 
     if k is not None:
@@ -179,7 +803,30 @@ def nla(x, frac=0.4, k=None, scheme='abs'):
     return res.reshape(Co, N, Ci)
 
 
+def _packed_nla(x: PackedCoefficients, frac=0.4, k=None, scheme='abs'):
+    # the same schemes as nla, whereas the candidates are the N kept coefficients rather than all Co*N ones
+    values = x.values
+    k_largest = k if k is not None else int(frac * x.N)
+    low = x.channel(0).size(0) if scheme == "keeplow" else 0
+    candidates = values[low:]
+    k_largest = min(k_largest, candidates.size(0))
+    if scheme in ('abs', 'keeplow'):
+        _, idx = candidates.abs().topk(k_largest, dim=0)
+    elif scheme == 'naive':
+        _, idx = candidates.topk(k_largest, dim=0)
+    else:
+        raise RuntimeError("{} is not a valid supported non-linear approximation scheme".format(scheme))
+    res = torch.zeros_like(values)
+    res[:low] = values[:low]
+    res[low:].scatter_(0, idx, candidates.gather(0, idx))
+    return x.with_values(res)
+
+
 def hard_threshold(x, T=0.3, lowest=False):
+    if isinstance(x, PackedCoefficients):  # in-place on the kept coefficients
+        high_pass = x.values[x.channel(0).size(0) if lowest else 0:]
+        high_pass[high_pass.abs() < T] = 0
+        return x
     if not lowest:
         x[x.abs() < T] = 0
     else:
@@ -0,0 +1,98 @@
+import torch
+
+
+class PackedCoefficients:
+    r"""
+    The critically sampled coefficients of a multi-channel filterbank, e.g., :class:`thgsp.filters.QmfCore`, wherein
+    every node keeps its coefficients in only one channel. Instead of the :obj:`(Co,N,Ci)` dense tensor that is zero
+    out of :obj:`channel_mask`, only the :obj:`(N,Ci)` kept coefficients are stored, grouped by channel.
+
+    Parameters
+    ----------
+    values: Tensor
+        Shape: :obj:`(N,Ci)`. The coefficients of nodes :obj:`perm`, those of the :obj:`c`-th channel are
+        :obj:`values[ptr[c]:ptr[c+1]]`.
+    perm:   LongTensor
+        Shape: :obj:`(N,)`. The nodes grouped by channel.
+    ptr:    LongTensor
+        Shape: :obj:`(Co+1,)`. The offsets of channels in :obj:`perm` and :obj:`values`.
+    """
+
+    def __init__(self, values: torch.Tensor, perm: torch.Tensor, ptr: torch.Tensor):
+        assert values.dim() == 2 and values.size(0) == perm.numel() == ptr[-1].item()
+        self.values = values
+        self.perm = perm
+        self.ptr = ptr
+        self._bounds = ptr.tolist()
+
+    @staticmethod
+    def layout(channel_mask: torch.Tensor):
+        """
+        The :obj:`perm` and :obj:`ptr` of a :obj:`(Co,N)` channel mask whose columns have exactly one :obj:`True`.
+        """
+        channel, perm = channel_mask.nonzero(as_tuple=True)  # channel-major, hence grouped by channel
+        assert perm.numel() == channel_mask.size(1), "every node must belong to exactly one channel"
+        ptr = channel.new_zeros(channel_mask.size(0) + 1)
+        ptr[1:] = torch.bincount(channel, minlength=channel_mask.size(0)).cumsum(0)
+        return perm, ptr
+
+    @classmethod
+    def from_dense(cls, x: torch.Tensor, channel_mask: torch.Tensor):
+        """
+        Pack the :obj:`(Co,N,Ci)` dense coefficients :obj:`x` by the :obj:`(Co,N)` :obj:`channel_mask`.
+        """
+        perm, ptr = cls.layout(channel_mask)
+        return cls(x[_ptr2channel(ptr), perm], perm, ptr)
+
+    @property
+    def n_channel(self) -> int:
+        return len(self._bounds) - 1
+
+    @property
+    def N(self) -> int:
+        return self.perm.numel()
+
+    @property
+    def shape(self):
+        """
+        The shape of the dense counterpart, i.e., :obj:`(Co,N,Ci)`.
+        """
+        return self.n_channel, self.N, self.values.size(-1)
+
+    @property
+    def channels(self) -> torch.Tensor:
+        """
+        The :obj:`(N,)` channel of every entry of :obj:`values`.
+        """
+        return _ptr2channel(self.ptr)
+
+    def channel(self, c: int) -> torch.Tensor:
+        """
+        The coefficients of the :obj:`c`-th channel, a view of :obj:`values`.
+        """
+        return self.values[self._bounds[c]:self._bounds[c + 1]]
+
+    def nodes(self, c: int) -> torch.Tensor:
+        """
+        The nodes of the :obj:`c`-th channel, a view of :obj:`perm`.
+        """
+        return self.perm[self._bounds[c]:self._bounds[c + 1]]
+
+    def with_values(self, values: torch.Tensor):
+        """
+        New coefficients of the same layout, which shares :obj:`perm` and :obj:`ptr`.
+        """
+        return self.__class__(values, self.perm, self.ptr)
+
+    def to_dense(self) -> torch.Tensor:
+        Co, N, Ci = self.shape
+        dense = self.values.new_zeros(Co, N, Ci)
+        dense[self.channels, self.perm] = self.values
+        return dense
+
+    def __repr__(self):
+        return "{}(n_channel={}, N={}, Ci={})".format(self.__class__.__name__, *self.shape)
+
+
+def _ptr2channel(ptr):
+    return torch.repeat_interleave(torch.arange(len(ptr) - 1, device=ptr.device), ptr[1:] - ptr[:-1])
@@ -1,9 +1,16 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import torch
 
+from thgsp.graphs.batch import GraphBatch
 from thgsp.graphs.core import GraphBase
-from .approximation import cheby_op, cheby_coeff
+from thgsp.graphs.laplace import LaplacianOperator
+from .approximation import cheby_op, cheby_coeff, cheby_coeff_batch, cheby_clenshaw, cheby_truncate, cheby_trim
+from .approximation import cheby_recurrence, scaled_laplace, evaluate_kernels, MAX_AUTO_ORDER
 from .kernels import meyer_kernel, get_kernel_name
+from .krylov import lanczos_filter
 
 
 class Filter:
@@ -18,13 +25,40 @@ class Filter:
         Case1: The :obj:`(Co,Ci)` array of :obj:`Co*Ci` filters; :obj:`Co` and :obj:`Ci` are the dimensions of input and
         output signals, respectively Case2: A callable python object; all :obj:`Co*Ci` filters employ this kernel.
         Case3: Set all :obj:`Co*Ci` filters as ideal low-pass ones.
-    lam_max:    float
-        The supremum of graph frequencies.
+    lam_max:    float, str, Tensor
+        The supremum of graph frequencies. If :obj:`"auto"`, use the estimate given by
+        :py:meth:`GraphBase.max_frequency` for the Laplacian of type :obj:`lap_type`, which is usually tighter than
+        the default :obj:`2.` and thus permits lower orders of Chebyshev approximation. For a
+        :class:`thgsp.graphs.GraphBatch`, :obj:`"auto"`(or a :obj:`(B,)` tensor) gives every batched graph its own
+        :math:`\\lambda_{max}`, see :py:meth:`GraphBatch.max_frequencies`, and one Chebyshev recurrence still filters
+        the whole batch with the coefficients of the graph every node belongs to.
+    order:  int, str
+        The order of Chebyshev approximation. If :obj:`"auto"`, every kernel is approximated by the lowest order whose
+        maximal error over :math:`[0,\\lambda_{max}]` is within :obj:`tol`, see
+        :func:`thgsp.filters.approximation.cheby_truncate`, and :obj:`order` becomes the highest one among kernels.
+        Not supported with per-graph :obj:`lam_max`.
+    lap_type:   str
+        The type of Laplacian, one of :obj:`"sym"`, :obj:`"comb"` and :obj:`"rw"`.
+    matrix_free:    bool
+        If True, Chebyshev approximation applies a :class:`LaplacianOperator` built on the adjacency instead of the
+        materialized Laplacian :py:meth:`GraphBase.L`.
+    memory_efficient:   bool
+        If True, the backward pass of Chebyshev approximation recomputes the Chebyshev basis instead of storing it,
+        see :func:`thgsp.filters.cheby_op`. Recommended for learning edge weights with high orders on large graphs.
+    tol:    float
+        The tolerance of approximation errors if :obj:`order="auto"`.
+    damping:    str, optional
+        :obj:`"jackson"` or :obj:`"lanczos"` to damp Chebyshev coefficients, which suppresses the Gibbs oscillation of
+        kernels with sharp transitions, see :func:`thgsp.filters.approximation.cheby_damping`.
 
     Attributes
     ----------
     N: int
         The number of graph nodes.
+    lam_max:    float
+        The supremum of graph frequencies, the largest one of a batch with per-graph :obj:`lam_max`.
+    lam_maxes:  Tensor, None
+        The :obj:`(B,)` per-graph maximal frequencies of a :class:`thgsp.graphs.GraphBatch`, otherwise :obj:`None`.
     order: int
         The degree of Chebyshev approximation.
     weight:     Tensor
@@ -39,13 +73,26 @@ class Filter:
     """
 
     def __init__(self, G: GraphBase, kernels=None, in_channels=None, out_channels=None, order=20, lam_max=2.,
-                 weight=None):
+                 weight=None, lap_type="sym", matrix_free=True, memory_efficient=False, tol=1e-6,
+                 damping=None):
+        if isinstance(lam_max, str) and lam_max == "auto":
+            lam_max = G.max_frequencies(lap_type) if isinstance(G, GraphBatch) else G.max_frequency(lap_type)
+        self.lam_maxes = None
+        if isinstance(lam_max, torch.Tensor):  # per graph of a batch
+            assert isinstance(G, GraphBatch) and lam_max.shape == (G.num_graphs,)
+            assert order != "auto", "order='auto' is not supported with per-graph lam_max"
+            self.lam_maxes = lam_max.to(G.dtype())
+            lam_max = lam_max.max().item()
         assert lam_max > 0
-        assert order > 1
+        assert order == "auto" or order > 1
 
         self.G = G
         self.order = order
         self.lam_max = lam_max
+        self.lap_type = lap_type
+        self.matrix_free = matrix_free
+        self.memory_efficient = memory_efficient
+        self.damping = damping
 
         self.kernels, self.in_channels, self.out_channels = self._check_kernels(kernels, in_channels, out_channels)
         self.Ci = self.in_channels
@@ -62,8 +109,15 @@ class Filter:
         self.weight = weight
 
         # for Chebyshev approximation
-        self.max_cheby_order = order
         self._coeff = None
+        self._L = None
+        if order == "auto":
+            coeff = cheby_coeff(self.kernels[None, ...], K=MAX_AUTO_ORDER, lam_max=self.lam_max, dtype=self.dtype,
+                                device=self.device)
+            coeff, orders = cheby_truncate(coeff, self.kernels[None, ...], self.lam_max, tol, damping=damping)
+            self.order = max(orders.max().item(), 1)
+            self._coeff = coeff[0, ..., :self.order + 1]
+        self.max_cheby_order = self.order
 
     def _check_kernels(self, kernels=None, Ci=None, Co=None):
         if isinstance(kernels, np.ndarray):
@@ -93,13 +147,13 @@ class Filter:
             raise RuntimeError(f"The penultimate dimension of signal:{x.shape[-2]}!= the number of nodes: {self.N}")
         return x.to(self.dtype)
 
-    def evaluate(self, low=None, high=None, in_channels=None, out_channels=None):
+    def evaluate(self, low=None, high=None, in_channels=None, out_channels=None, k=None, which="SA"):
         if low is None:
             low = 0
         if high is None:
             high = self.lam_max
         assert low <= high
-        fs = self.G.spectrum()
+        fs = self.G.spectrum(self.lap_type, k=k, which=which)
 
         if in_channels is None:
             in_channels = range(self.in_channels)
@@ -113,48 +167,249 @@ class Filter:
             raise RuntimeError("No frequency in the interval [ {}, {}]".format(low, high))
         fre_response = torch.zeros(self.out_channels, self.in_channels, len(ls2eval),
                                    dtype=self.dtype, device=self.device)
-        kernel_cache = {}
-        for i in in_channels:
-            for j in out_channels:
-                krn = self.kernels[j, i]
-                kid = id(krn)
-                if kid in kernel_cache:
-                    fre_response[j, i] = kernel_cache[kid]
-                else:
-                    fre_response[j, i] = krn(ls2eval)
-                    kernel_cache[kid] = fre_response[j, i]
+        out_channels, in_channels = list(out_channels), list(in_channels)
+        kernels = self.kernels[np.ix_(out_channels, in_channels)]
+        rows = torch.as_tensor(out_channels, device=self.device).view(-1, 1)
+        cols = torch.as_tensor(in_channels, device=self.device).view(1, -1)
+        fre_response[rows, cols] = evaluate_kernels(kernels[None], ls2eval)[0].to(self.dtype)
         return fre_response
 
-    def filter(self, x):
+    def filter(self, x, k=None, which="SA", return_error=False):
+        """
+        Filter signals in the graph frequency domain.
+
+        Parameters
+        ----------
+        x:  Tensor
+            The signal to filter. See :py:meth:`__call__`.
+        k:  int, optional
+            If given, only the :obj:`k` eigenpairs selected by :obj:`which` are computed(by a sparse iterative solver)
+            and used, so that the dense :obj:`(N,N)` GFT matrix is never formed. Components of :obj:`x` outside the
+            span of these eigenvectors are discarded. The eigenpairs are computed once per call, and cached by the
+            graph if it is created with :obj:`cache=True`. Hence e.g. the :obj:`k` lowest eigenpairs suffice for
+            low-pass kernels vanishing above a cutoff, at the cost of :obj:`O(Nk)` per signal.
+        which:  str
+            :obj:`"SA"` for the :obj:`k` lowest frequencies and :obj:`"LA"` for the :obj:`k` highest ones.
+        return_error:   bool
+            If True, also return an upper bound of the truncation error.
+
+        Returns
+        -------
+        Tensor
+            Shape: :obj:`(Co,N,Ci)`.
+        Tensor
+            Only if :obj:`return_error`. Shape: :obj:`(Co,Ci)`. The bound
+            :math:`\\sup_{\\lambda\\in\\Omega}|g(\\lambda)|\\cdot\\|x-U_kU_k^\\top x\\|_2` of the
+            :math:`\\ell_2` error of every filtered signal, wherein :math:`\\Omega` is the frequency band not covered
+            by the :obj:`k` eigenpairs, i.e., :math:`[\\lambda_k,\\lambda_{max}]` for :obj:`which="SA"` with the upper
+            bound of :math:`\\lambda_{max}` given by :py:meth:`GraphBase.max_frequency`. The supremum is taken over a
+            dense grid of :math:`\\Omega`. Zeros if :obj:`k` is :obj:`None`.
+        """
         x = self._check_signal(x)  # (Co,N,Ci)
-        U = self.G.U()
-        response = self.evaluate()  # (Co,Ci,N)
-        gft_coeff = U.t() @ x  # (Co,N,Ci)
+        fs, U = self.G.spectral(self.lap_type, k=k, which=which)  # (N,) and (N,N), or (k,) and (N,k)
+        response = evaluate_kernels(self.kernels[None], fs)[0].to(self.dtype)  # (Co,Ci,N) or (Co,Ci,k)
+        gft_coeff = U.t() @ x  # (Co,N,Ci) or (Co,k,Ci)
         # (Co, N, Ci) * (Co, Ci, N).permute(0, 2, 1) --> (Co, N, Ci)
         spectral_out = gft_coeff * response.permute(0, 2, 1)
         #  (N, N) @ (Co, N, Ci) --> (Co, N, Ci)
         spatial_out = U @ spectral_out
-        return spatial_out
+        if not return_error:
+            return spatial_out
+
+        error = torch.zeros(self.Co, self.Ci, dtype=self.dtype, device=self.device)
+        if k is not None:
+            lam_max = max(self.G.max_frequency(self.lap_type), fs[-1].item())
+            low, high = (fs[-1].item(), lam_max) if which == "SA" else (0., fs[0].item())
+            band = torch.linspace(low, max(low, high), 1000, dtype=self.dtype, device=self.device)
+            sup = evaluate_kernels(self.kernels[None], band)[0].abs().max(-1)[0].to(self.dtype)  # Co x Ci
+            residual = (x - U @ gft_coeff).norm(dim=-2)  # (Co or 1) x Ci
+            error = sup * residual
+        return spatial_out, error
+
+    def _coeff_name(self):
+        """
+        The name of Chebyshev coefficients in the :class:`EigenStore` of the graph, :obj:`None` if there is no store or
+        any kernel(e.g. a lambda or a closure) has no name that is stable across processes.
+        """
+        if self.G.store is None:
+            return None
+        names = []
+        for krn in self.kernels.flat:
+            qualname = getattr(krn, "__qualname__", None)
+            module = getattr(krn, "__module__", None)
+            if qualname is None or module is None or "<" in qualname:
+                return None
+            names.append(module + "." + qualname)
+        info = repr((self.kernels.shape, names, self.order, float(self.lam_max), self.damping, str(self.dtype)))
+        return "cheby-" + hashlib.blake2b(info.encode(), digest_size=10).hexdigest()
 
     @property
     def cheby_coefficients(self):
+        """
+        The :obj:`(Co,Ci,K+1)` Chebyshev coefficients, or the :obj:`(B,Co,Ci,K+1)` ones of every graph of a batch
+        with per-graph :obj:`lam_max`.
+        """
+        if self._coeff is None and self.lam_maxes is not None:
+            self._coeff = cheby_coeff_batch(self.kernels[None, ...], K=self.order, lam_max=self.lam_maxes,
+                                            damping=self.damping).squeeze_(1)
         if self._coeff is None:
-            coeff = cheby_coeff(self.kernels[None, ...], K=self.order, lam_max=self.lam_max,
-                                dtype=self.dtype, device=self.device).squeeze_(0)  # the first dim is pseudo
+            name = self._coeff_name()
+            coeff = None
+            if name is not None:
+                coeff = self.G.store.load(self.G.fingerprint(), name, self.dtype, self.device)
+            if coeff is None:
+                coeff = cheby_coeff(self.kernels[None, ...], K=self.order, lam_max=self.lam_max, dtype=self.dtype,
+                                    device=self.device, damping=self.damping).squeeze_(0)  # the first dim is pseudo
+                if name is not None:
+                    self.G.store.save(self.G.fingerprint(), name, coeff)
             self._coeff = coeff
         return self._coeff
 
-    def cheby_filter(self, x, order=None):
+    @property
+    def laplacian(self):
+        """
+        The Laplacian(or :class:`LaplacianOperator` if :obj:`matrix_free`) for Chebyshev approximation. It is kept by
+        this filter unless the graph requires grad, so that its rescaled version is memoized by
+        :func:`thgsp.filters.approximation.scaled_laplace` across calls.
+        """
+        if self._L is not None:
+            return self._L
+        L = LaplacianOperator(self.G, self.lap_type) if self.matrix_free else self.G.L(self.lap_type)
+        if not self.G.requires_grad():
+            self._L = L
+        return L
+
+    def cheby_filter(self, x, order=None, out=None):
+        """
+        Filter signals by Chebyshev approximation.
+
+        Parameters
+        ----------
+        x:  Tensor
+            The signal to filter. See :py:meth:`__call__`.
+        order:  int, optional
+            The order of approximation, no larger than :obj:`self.order`.
+        out:    Tensor, optional
+            A :obj:`(Co,N,Ci)` tensor to write the result in. If given, the memory-lean
+            :func:`thgsp.filters.cheby_clenshaw` is used, which does not support autograd nor per-graph
+            :obj:`lam_max`.
+
+        Returns
+        -------
+        Tensor
+            Shape: :obj:`(Co,N,Ci)`.
+        """
         if order is None:
             order = self.order
         if order > self.order:
             raise RuntimeError(f"The coefficients of Chebyshev polynomials beyond order {self.order} are not computed")
         x = self._check_signal(x)
-        coeff = self.cheby_coefficients[:, :, :order + 1]  # Co x Ci x K+1
-        out = cheby_op(x, self.G.L(), coeff, self.lam_max)  # Co x N X Ci
+        coeff = self.cheby_coefficients[..., :order + 1]  # (B x) Co x Ci x K+1
+        if self.lam_maxes is not None:
+            if out is not None:
+                raise RuntimeError("Filtering into the given output is not supported with per-graph lam_max")
+            batch = self.G.batch
+            return cheby_op(x, self.laplacian, coeff, self.lam_maxes[batch], self.memory_efficient, index=batch)
+        if out is not None:
+            return cheby_clenshaw(x, self.laplacian, coeff, self.lam_max, out=out)
+        out = cheby_op(x, self.laplacian, coeff, self.lam_max, self.memory_efficient)  # Co x N X Ci
         return out
 
-    def __call__(self, x, cheby=True):
+    def stream(self, chunks, chunk_size: int = 1024, out: torch.Tensor = None):
+        """
+        Filter a long stream of graph signals block by block, e.g., a time series of :obj:`T` signals that does not fit
+        in memory, as :py:meth:`__call__` with the Chebyshev engine does. All signals of a block are filtered by one
+        Chebyshev recurrence with the normalized Laplacian rescaled once for the whole stream, and the next block is
+        loaded in a background thread while the current one is filtered. Autograd is disabled.
+
+        Parameters
+        ----------
+        chunks: iterable, array, Tensor
+            An iterable of :obj:`(t,N)` or :obj:`(t,N,Ci)` blocks of the signals at consecutive time steps, or a
+            single :obj:`(T,N)` or :obj:`(T,N,Ci)` array(e.g. a :obj:`numpy.memmap`) or tensor which is split into
+            blocks of :obj:`chunk_size` time steps.
+        chunk_size: int
+            The number of time steps per block if :obj:`chunks` is an array or a tensor.
+        out:    Tensor, optional
+            A preallocated :obj:`(T,N,Co)` tensor the filtered blocks are written into, e.g., one made by
+            :func:`torch.from_numpy` of a writable memory-mapped array.
+
+        Yields
+        ------
+        Tensor
+            The filtered block of shape :obj:`(t,N,Co)`, a view of :obj:`out` if given.
+        """
+        if isinstance(chunks, (np.ndarray, torch.Tensor)):
+            chunks = (chunks[s:s + chunk_size] for s in range(0, chunks.shape[0], chunk_size))
+        chunks = iter(chunks)
+        N, Co, Ci = self.N, self.Co, self.Ci
+
+        def fetch():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return None
+            if isinstance(chunk, np.ndarray):
+                chunk = np.array(chunk)  # read e.g. a memory-mapped block here rather than in the recurrence
+            x = torch.as_tensor(chunk).to(dtype=self.dtype, device=self.device)
+            x = x.unsqueeze(-1) if x.dim() == 2 else x
+            if x.shape[1:] != (N, Ci):
+                raise RuntimeError("Blocks of shape (t,{},{}) expected, but got {}".format(N, Ci, tuple(x.shape)))
+            return x
+
+        with torch.no_grad():
+            # fold the weights of __call__ into the coefficients, so that channels are summed in the contraction
+            coeff = cheby_trim(self.cheby_coefficients * self.weight.unsqueeze(-1))  # (B x) Co x Ci x K+1
+            lam_max, batch = self.lam_max, None
+            if self.lam_maxes is not None:
+                batch = self.G.batch
+                lam_max = self.lam_maxes[batch]
+            L_norm = scaled_laplace(self.laplacian, lam_max)
+        expanded = {}  # t --> the coefficients of the (N,t*Ci) block of columns
+
+        start = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = executor.submit(fetch)
+            while True:
+                x = pending.result()
+                if x is None:
+                    break
+                pending = executor.submit(fetch)  # overlap loading the next block with filtering this one
+                t = x.size(0)
+                with torch.no_grad():
+                    if t not in expanded:
+                        index = torch.arange(Ci, device=self.device).repeat(t)
+                        expanded[t] = coeff.index_select(-2, index)  # (B x) Co x t*Ci x K+1
+                    columns = x.permute(1, 0, 2).reshape(N, t * Ci)
+                    y = cheby_recurrence(columns, L_norm, expanded[t], index=batch)  # N x Co x t*Ci
+                    y = y.view(N, Co, t, Ci).sum(-1).permute(2, 0, 1)  # t x N x Co
+                    if out is not None:
+                        y = out[start:start + t].copy_(y)
+                start += t
+                yield y
+
+    def lanczos_filter(self, x, order=None):
+        """
+        Filter signals by a Lanczos(Krylov) approximation, see :func:`thgsp.filters.krylov.lanczos_filter`.
+
+        Parameters
+        ----------
+        x:  Tensor
+            The signal to filter. See :py:meth:`__call__`.
+        order:  int, optional
+            The number of Lanczos iterations, :obj:`self.order` if not given.
+
+        Returns
+        -------
+        Tensor
+            Shape: :obj:`(Co,N,Ci)`.
+        """
+        if self.lap_type == "rw":
+            raise RuntimeError("The Lanczos approximation requires a symmetric Laplacian, not 'rw'")
+        x = self._check_signal(x)
+        x = x[0] if x.size(0) == 1 else x
+        return lanczos_filter(x, self.laplacian, self.kernels, self.order if order is None else order)
+
+    def __call__(self, x, cheby=True, engine=None):
         """
         Filter the input signal **x**.
 
@@ -166,14 +421,28 @@ class Filter:
         cheby: bool
             If :py:obj:`True`, conduct filtering via Chebysheve approximation. Otherwise signals are filtered in a
             brute-force way - do a complete eigenvalue decompositon of Laplacian :math:`L` to get the GFT and IGFT
-            matrces.
+            matrces. Ignored if :obj:`engine` is given.
+        engine: str, optional
+            :obj:`"cheby"`: Chebyshev approximation, see :py:meth:`cheby_filter`.
+            :obj:`"lanczos"`: Lanczos approximation with :obj:`order` iterations, see :py:meth:`lanczos_filter`, which
+            converges faster for smooth kernels, e.g., the heat kernel, or clustered spectra.
+            :obj:`"exact"`: filtering in the graph frequency domain, see :py:meth:`filter`.
 
         Returns
         -------
         Tensor
             Filtered signsls. Shape: :obj:`(N,Co)`. :obj:`Co` is the output channels.
         """
-        out = self.cheby_filter(x) if cheby else self.filter(x)
+        if engine is None:
+            engine = "cheby" if cheby else "exact"
+        if engine == "cheby":
+            out = self.cheby_filter(x)
+        elif engine == "lanczos":
+            out = self.lanczos_filter(x)
+        elif engine == "exact":
+            out = self.filter(x)
+        else:
+            raise RuntimeError("{} is not a valid filtering engine".format(engine))
         out_aggr = out @ self.weight[:, :, None]  # (Co, N ,Ci) @ (Co, Ci, 1) = (Co, N, 1)
         return out_aggr.permute(1, 0, 2).squeeze_()
 
@@ -1,10 +1,14 @@
 import math
+from functools import lru_cache, partial
 from itertools import combinations
 
 import numpy as np
 import torch
 from scipy.special import comb
 
+# the number of k memoized by design_biorth_kernel and biorth_kernels
+MAX_CACHED_DESIGNS = 32
+
 
 # Utils
 def get_kernel_name(kernel_array, identation=False):
@@ -154,9 +158,9 @@ def design_biorth_kernel(k):
 
     Notes
     -----
-    Large :math:`k(k>14)` may lead to a failed kernel design, possibly due to the accumulated computation
-    error arising in the high order power operations. Empirically speaking, a smaller :math:`k(2<k<12)` works
-    well.
+    The design enumerates root factorizations, hence it is memoized per :obj:`k` and copies are returned. Large
+    :math:`k(k>14)` may lead to a failed kernel design, possibly due to the accumulated computation error arising in
+    the high order power operations. Empirically speaking, a smaller :math:`k(2<k<12)` works well.
 
     References
     ----------
@@ -164,6 +168,12 @@ def design_biorth_kernel(k):
             undirected graphs,” IEEE Trans on Signal Processing, 2013.
 
     """
+    h0_c, g0_c, theta_best = _design_biorth_kernel(k)
+    return h0_c.copy(), g0_c.copy(), theta_best
+
+
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def _design_biorth_kernel(k):
     K = 2 * k
     zeros_of_R_lam, r_highest = design_p(K)  # ascending in abs(imaginary)
     h0_c_highest = g0_c_highest = np.sqrt(r_highest)
@@ -205,6 +215,49 @@ def design_biorth_kernel(k):
     return h0_c, g0_c, theta_best
 
 
+@lru_cache(maxsize=MAX_CACHED_DESIGNS)
+def biorth_kernels(k):
+    """
+    The analysis kernels :math:`h_0,h_1` and synthesis kernels :math:`g_0,g_1` of graphBior filterbanks designed by
+    :func:`design_biorth_kernel`, wherein :math:`h_1(\\lambda)=g_0(2-\\lambda)` and
+    :math:`g_1(\\lambda)=h_0(2-\\lambda)`. They are memoized per :obj:`k`, so that filterbanks of the same
+    :obj:`k` share the kernel objects, and thus the cached Chebyshev coefficients of them, see
+    :func:`thgsp.filters.approximation.cheby_coeff`.
+
+    Returns
+    -------
+    h0, h1, g0, g1: callable
+    orthogonality:  float
+    """
+    from .approximation import polyval
+
+    h0_c, g0_c, orthogonality = _design_biorth_kernel(k)
+    h0 = partial(polyval, torch.from_numpy(h0_c))
+    h0.__name__ = 'h0'
+    g0 = partial(polyval, torch.from_numpy(g0_c))
+    g0.__name__ = 'g0'
+
+    def h1(x):
+        return g0(2 - x)
+
+    def g1(x):
+        return h0(2 - x)
+
+    return h0, h1, g0, g1, orthogonality
+
+
+def biorth_cache_info() -> dict:
+    """
+    The statistics of the memoized :func:`design_biorth_kernel` and :func:`biorth_kernels`.
+    """
+    return {"design": _design_biorth_kernel.cache_info()._asdict(), "kernels": biorth_kernels.cache_info()._asdict()}
+
+
+def clear_biorth_cache():
+    _design_biorth_kernel.cache_clear()
+    biorth_kernels.cache_clear()
+
+
 def get_kernel_name(kernel_array, indentation=False):
     get_name = np.vectorize(lambda f: '_'.join(f.__name__.split('_')[:-1]) if '_' in f.__name__ else f.__name__)
     info = get_name(kernel_array)
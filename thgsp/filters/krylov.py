@@ -0,0 +1,111 @@
+import torch
+
+from .approximation import evaluate_kernels
+
+
+def lanczos(L, x: torch.Tensor, K: int = 20):
+    r"""
+    Run :obj:`K` Lanczos iterations with full reorthogonalization on every column of :obj:`x` in a batch, i.e.,
+    :math:`LV_K\approx V_KT_K` with the orthonormal Krylov basis :math:`V_K` of :math:`\{x,Lx,\dots,L^{K-1}x\}`.
+
+    Parameters
+    ----------
+    L:  SparseTensor, LaplacianOperator
+        The :obj:`(N,N)` symmetric Laplacian.
+    x:  Tensor
+        The :obj:`(N,C)` starting vectors.
+    K:  int
+        The number of iterations, no larger than :obj:`N`.
+
+    Returns
+    -------
+    V:  Tensor
+        The :obj:`(K,N,C)` Krylov bases.
+    T:  Tensor
+        The :obj:`(C,K,K)` tridiagonal matrices.
+    norm:   Tensor
+        The :obj:`(C,)` norms of :obj:`x`.
+    """
+    N, C = x.shape
+    K = min(K, N)
+    tiny = torch.finfo(x.dtype).tiny
+    eps = torch.finfo(x.dtype).eps
+    norm = x.norm(dim=0)
+    V = x.new_zeros(K, N, C)
+    alpha = x.new_zeros(C, K)
+    beta = x.new_zeros(C, K)
+
+    v = x / norm.clamp_min(tiny)
+    v_old = torch.zeros_like(x)
+    b = x.new_zeros(C)
+    for j in range(K):
+        V[j] = v
+        w = L @ v
+        a = (w * v).sum(0)
+        alpha[:, j] = a
+        w = w - a * v - b * v_old
+        w = w - (V[:j + 1] * (V[:j + 1] * w).sum(1, keepdim=True)).sum(0)  # full reorthogonalization
+        # on breakdown(an invariant subspace is found) the remaining basis vectors are zeros, which decouples T
+        b_new = w.norm(dim=0)
+        b_new = b_new * (b_new > 100 * eps * (a.abs() + b))
+        beta[:, j] = b_new
+        v_old = v
+        v = w / b_new.clamp_min(tiny) * (b_new > 0)
+        b = b_new
+    T = torch.diag_embed(alpha) + torch.diag_embed(beta[:, :-1], 1) + torch.diag_embed(beta[:, :-1], -1)
+    return V, T, norm
+
+
+def lanczos_filter(x: torch.Tensor, L, kernels, K: int = 20):
+    r"""
+    Approximate graph filtering :math:`f(L)x` by :obj:`K` Lanczos iterations
+
+    .. math::
+        f(L)x\approx\|x\|V_Kf(T_K)e_1=\|x\|V_KQf(\Theta)Q^\top e_1,
+
+    wherein :math:`T_K=Q\Theta Q^\top`. Kernels are evaluated at the Ritz values :math:`\Theta`, which adapt to the
+    spectrum, hence the approximation converges much faster than a Chebyshev expansion of the same order(and the same
+    number of sparse multiplications) for smooth kernels, e.g., the heat kernel, or clustered spectra. A Krylov basis
+    is built per input signal and shared by all :obj:`Co` output channels.
+
+    Parameters
+    ----------
+    x:  Tensor
+        The signals of shape :obj:`(N,Ci)`, or :obj:`(Co,N,Ci)` wherein the :obj:`(o,i)`-th kernel filters
+        :obj:`x[o,:,i]`.
+    L:  SparseTensor, LaplacianOperator
+        The :obj:`(N,N)` symmetric Laplacian.
+    kernels:    array
+        The :obj:`(Co,Ci)` kernels.
+    K:  int
+        The number of Lanczos iterations.
+
+    Returns
+    -------
+    Tensor
+        The filtered signals of shape :obj:`(Co,N,Ci)`.
+    """
+    Co, Ci = kernels.shape
+    shared = x.dim() == 2
+    N = x.size(-2)
+    columns = x if shared else x.permute(1, 0, 2).reshape(N, Co * Ci)  # N x C
+    C = columns.size(-1)
+
+    V, T, norm = lanczos(L, columns, K)
+    theta, Q = torch.symeig(T, eigenvectors=True)  # C x K, C x K x K
+    K = theta.size(-1)
+    # the response of the kernel of every column at the Ritz values of that column
+    if shared:  # Co x Ci x Ci*K --> Co x Ci(kernel) x Ci(column) x K --> Co x C x K
+        response = evaluate_kernels(kernels[None], theta.reshape(-1))[0].view(Co, Ci, C, K)
+        response = response.diagonal(dim1=1, dim2=2).permute(0, 2, 1)
+    else:  # C x C*K --> C(kernel) x C(column) x K --> 1 x C x K
+        response = evaluate_kernels(kernels.reshape(1, 1, -1), theta.reshape(-1))[0, 0].view(C, C, K)
+        response = response.diagonal(dim1=0, dim2=1).t().unsqueeze(0)
+    response = response.to(x.dtype)
+
+    # ||x|| Q f(Theta) Q^T e_1
+    weights = (Q @ (response * Q[:, 0, :]).unsqueeze(-1)).squeeze(-1) * norm.unsqueeze(-1)  # Co x C x K
+    out = torch.einsum('knc,ock->onc', V, weights)  # Co(or 1) x N x C
+    if shared:
+        return out
+    return out[0].view(N, Co, Ci).permute(1, 0, 2).contiguous()
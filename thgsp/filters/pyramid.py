@@ -0,0 +1,117 @@
+import math
+from typing import List, Optional
+
+import torch
+
+from thgsp.graphs import Graph, kron_reduction
+from .qmf import ColorQmf, ColorBiorth
+
+
+class WaveletPyramid:
+    r"""
+    A multilevel graph wavelet transform. At every level, a one-level filterbank(:class:`ColorQmf` or
+    :class:`ColorBiorth`) decomposes the signal on the current graph, and the coefficients of the LL channel(the
+    0-th one) on its nodes are the signal of the next level, whose graph is the Kron reduction(see
+    :func:`thgsp.graphs.kron_reduction`) of the current one onto these nodes.
+
+    The reduced graphs, their bipartite decompositions and filterbanks of all levels are built once and kept. The
+    reduced graphs are sparsified to at most :obj:`max_degree` heaviest edges per node, hence their nonzeros stay
+    :obj:`O(|E|)` and shrink geometrically with the nodes, since the LL channel holds about a :obj:`1/2^M` fraction of
+    nodes. Thus a :obj:`J`-level transform costs little more than the first level.
+
+    Parameters
+    ----------
+    G:  Graph
+        The graph of the finest level.
+    levels: int
+        The maximal number of levels :obj:`J`. Fewer levels are built if the LL channel has less than two nodes.
+    biorth: bool
+        If True, use :class:`ColorBiorth`, otherwise :class:`ColorQmf`.
+    tol:    float
+        The relative weight below which edges of the reduced graphs are dropped, see
+        :func:`thgsp.graphs.kron_reduction`.
+    max_degree: int, optional
+        The number of heaviest edges kept per node of the reduced graphs, the average degree of :obj:`G` if not given.
+    exact:  bool
+        If True, reduce graphs by the exact Schur complement, which is dense before the sparsification, rather than by
+        the local reduction, see :func:`thgsp.graphs.kron_reduction`.
+    kwargs: dict
+        Passed to the filterbank of every level, e.g., :obj:`order`, :obj:`in_channels` and :obj:`k`. The
+        decomposition strategy must be :obj:`"harary"`, whose channels partition the nodes.
+
+    Attributes
+    ----------
+    graphs: list
+        The :obj:`J` graphs from the finest to the coarsest.
+    banks:  list
+        The :obj:`J` filterbanks.
+    nodes:  list
+        The :obj:`J-1` indices of the nodes of the :obj:`j+1`-th graph in the :obj:`j`-th one.
+    """
+
+    def __init__(self, G: Graph, levels: int = 3, biorth=False, tol: float = 1e-2, max_degree: Optional[int] = None,
+                 exact=False, **kwargs):
+        assert levels > 0
+        if max_degree is None:
+            max_degree = max(math.ceil(G.nnz() / G.n_node), 1)
+        assert kwargs.get("strategy", "harary") == "harary"
+        bank_type = ColorBiorth if biorth else ColorQmf
+        self.graphs, self.banks, self.nodes = [G], [bank_type(G, **kwargs)], []
+        for j in range(1, levels):
+            ll = self.banks[-1].channel_mask[0].nonzero().view(-1)  # the nodes of the LL channel
+            if ll.numel() < 2:
+                break
+            G = Graph(kron_reduction(G, ll, tol, max_degree, exact))
+            self.nodes.append(ll)
+            self.graphs.append(G)
+            self.banks.append(bank_type(G, **kwargs))
+
+    @property
+    def levels(self) -> int:
+        return len(self.banks)
+
+    def analyze(self, x: torch.Tensor) -> List[torch.Tensor]:
+        """
+        Parameters
+        ----------
+        x:  Tensor
+            The :obj:`(N,)` or :obj:`(N,Ci)` signals on the finest graph.
+
+        Returns
+        -------
+        list
+            The :obj:`(Co,N_j,Ci)` coefficients of every level :obj:`j`. The LL channels of all but the coarsest
+            level are zeros, since they are decomposed by the next level.
+        """
+        coeffs = []
+        for j, bank in enumerate(self.banks):
+            y = bank.analyze(x)  # Co x N_j x Ci
+            if j < self.levels - 1:
+                x = y[0, self.nodes[j]]  # N_{j+1} x Ci
+                y[0] = 0
+            coeffs.append(y)
+        return coeffs
+
+    def synthesize(self, coeffs: List[torch.Tensor]) -> torch.Tensor:
+        """
+        Reconstruct the signals from the coefficients given by :py:meth:`analyze`, from the coarsest level up.
+
+        Returns
+        -------
+        Tensor
+            The :obj:`(N,Ci)` signals on the finest graph.
+        """
+        assert len(coeffs) == self.levels
+        x = None
+        for j in range(self.levels - 1, -1, -1):
+            y = coeffs[j]
+            if x is not None:  # the LL channel reconstructed by the coarser level
+                y = y.clone()
+                y[0, self.nodes[j]] = x
+            x = self.banks[j].synthesize(y, reduce=True)[0]  # N_j x Ci
+        return x
+
+    def __repr__(self):
+        sizes = [G.n_node for G in self.graphs]
+        return "{}(levels={}, n_node={}, bank={})".format(self.__class__.__name__, self.levels, sizes,
+                                                          self.banks[0].__class__.__name__)
@@ -6,20 +6,25 @@ import torch
 from scipy.sparse import diags
 from torch_sparse import SparseTensor
 
+from thgsp.alg import spmm
 from thgsp.bga import beta2channel_mask, beta_dist2channel_name, is_bipartite_fix, laplace
-from thgsp.bga import harary, osglm, amfs, admm_bga, admm_lbga_ray
-from thgsp.graphs import Graph
-from .approximation import cheby_coeff, cheby_op, polyval, cheby_op_basis
-from .kernels import meyer_kernel, meyer_mirror_kernel, get_kernel_name, design_biorth_kernel
+from thgsp.bga import harary, osglm, amfs, admm_bga, admm_lbga_ray, cached_decomposition
+from thgsp.convert import to_torch_sparse
+from thgsp.graphs import Graph, LaplacianOperator
+from thgsp.graphs.laplace import laplace as thgsp_laplace
+from .approximation import cheby_coeff, cheby_recurrence, cheby_trim, cheby_truncate, scaled_laplace, \
+    cheby_op_basis, cheby_op_basis_sparse, sparse_truncate, MAX_AUTO_ORDER
+from .coefficients import PackedCoefficients
+from .kernels import meyer_kernel, meyer_mirror_kernel, get_kernel_name, biorth_kernels
 
 
 class QmfCore:
     def __init__(self, bptG: List[SparseTensor], beta, analyze_kernels=None, synthesis_kernels=None, in_channels=1,
-                 order=24, lam_max=2., zeroDC=False):
+                 order=24, lam_max=2., zeroDC=False, tol=1e-6, damping=None):
         assert len(bptG) == beta.shape[-1]
         assert bptG[0].size(-1) == beta.shape[0]
         assert lam_max > 0
-        assert order > 0
+        assert order == "auto" or order > 0
 
         self.N, self.M = beta.shape
         self.in_channels = self.Ci = in_channels
@@ -33,10 +38,15 @@ class QmfCore:
 
         self.lam_max = lam_max
         self.zeroDC = zeroDC
+        self.damping = damping
 
         self.bptL, self.bptD05 = self.compute_laplace(bptG)
+        # D^{1/2} for analysis, precomputed with D^{-1/2} and fused into the Chebyshev recurrence by its 'right' and
+        # 'left' scalings, see cheby_recurrence
+        self.bptD05_inv = self.bptD05.reciprocal() if zeroDC else None
         self.channel_mask, self.beta_dist = beta2channel_mask(beta)
         self.channel_mask = self.channel_mask.to(self.device)
+        self.channel_perm, self.channel_ptr = PackedCoefficients.layout(self.channel_mask)
         self.out_channels, _ = self.beta_dist.shape
         self.Co = self.out_channels  # alias of out_channels
         self.channel_name = beta_dist2channel_name(self.beta_dist)
@@ -44,39 +54,106 @@ class QmfCore:
         self.kernel_a = self.parse_kernels(analyze_kernels)
         self.kernel_s = self.parse_kernels(synthesis_kernels)
 
-        self.coefficient_a = cheby_coeff(self.kernel_a, lam_max=lam_max, K=order, dtype=self.dtype,
-                                         device=self.device)
-
+        K = MAX_AUTO_ORDER if order == "auto" else order
+        damp = None if order == "auto" else damping  # cheby_truncate damps per order
+        self.coefficient_a = cheby_coeff(self.kernel_a, lam_max=lam_max, K=K, dtype=self.dtype, device=self.device,
+                                         damping=damp)
         if synthesis_kernels is None:  # GraphQmf Meyer
             self.coefficient_s = self.coefficient_a
         else:  # GraphBiorth
-            self.coefficient_s = cheby_coeff(self.kernel_s, lam_max=lam_max, K=order, dtype=self.dtype,
-                                             device=self.device)
+            self.coefficient_s = cheby_coeff(self.kernel_s, lam_max=lam_max, K=K, dtype=self.dtype,
+                                             device=self.device, damping=damp)
+
+        if order == "auto":  # truncate per kernel, and cheby_recurrence runs up to the highest order of each stage
+            self.coefficient_a, orders_a = cheby_truncate(self.coefficient_a, self.kernel_a, lam_max, tol,
+                                                          damping=damping)
+            if synthesis_kernels is None:
+                self.coefficient_s, orders_s = self.coefficient_a, orders_a
+            else:
+                self.coefficient_s, orders_s = cheby_truncate(self.coefficient_s, self.kernel_s, lam_max, tol,
+                                                              damping=damping)
+            self.order = max(orders_a.max().item(), orders_s.max().item(), 1)
+            self.coefficient_a = self.coefficient_a[..., :self.order + 1]
+            self.coefficient_s = self.coefficient_s[..., :self.order + 1]
+
+        self._analysis_tree, self._analysis_leaf = self._build_analysis_tree()
+        self._synthesis_tree, self._synthesis_leaf = self._build_synthesis_tree()
 
     def compute_laplace(self, bptG):
         bptL = []
-        N = bptG[0].size(-1)
-        bptD05 = torch.zeros(self.M, self.N, device=self.device) if self.zeroDC else None
-        loop_index = torch.arange(N, device=self.device).unsqueeze_(0)
+        bptD05 = torch.zeros(self.M, self.N, dtype=self.dtype, device=self.device) if self.zeroDC else None
         for i, adj in enumerate(bptG):
             deg = adj.sum(0)
-            row, col, val = adj.clone().coo()
-            deg05 = deg.pow(-0.5)
             if self.zeroDC:
-                deg05dc = deg05.clone().detach()
+                deg05dc = deg.pow(-0.5).detach()
                 deg05dc[deg05dc == float('inf')] = 1
                 bptD05[i] = deg05dc
-
-            deg05[deg05 == float('inf')] = 0
-            wgt = deg05[row] * val * deg05[col]
-            wgt = torch.cat([-wgt.unsqueeze_(0), val.new_ones(1, N)], 1).squeeze_()
-
-            row = torch.cat([row.unsqueeze_(0), loop_index], 1).squeeze_()
-            col = torch.cat([col.unsqueeze_(0), loop_index], 1).squeeze_()
-            lap = SparseTensor(row=row, col=col, value=wgt)
-            bptL.append(lap)
+            # matrix-free, nothing but the adjacency and degrees is kept
+            bptL.append(LaplacianOperator(adj, "sym", deg=deg))
         return bptL, bptD05
 
+    def kernel_tree(self, kernels):
+        """
+        The prefix tree of the kernel sequences of channels. Channels whose kernels(objects) of the first :obj:`g+1`
+        stages coincide, e.g., channels whose rows of :obj:`beta_dist` share a prefix of length :obj:`g+1` for the
+        default kernels, are one node at level :obj:`g` of the tree.
+
+        Parameters
+        ----------
+        kernels:    array
+            The :obj:`(M,Co,Ci)` kernels.
+
+        Returns
+        -------
+        nodes:  list
+            :obj:`M` arrays of shape :obj:`(Co,)`, the node at level :obj:`g` of every channel.
+        reps:   list
+            :obj:`M` arrays, a representative channel of every node at level :obj:`g`.
+        """
+        keys = [()] * self.Co
+        nodes, reps = [], []
+        for g in range(self.M):
+            keys = [keys[c] + (tuple(id(krn) for krn in kernels[g, c]),) for c in range(self.Co)]
+            index = {}
+            node = np.array([index.setdefault(key, len(index)) for key in keys])
+            rep = np.empty(len(index), dtype=np.int64)
+            rep[node] = np.arange(self.Co)
+            nodes.append(node)
+            reps.append(rep)
+        return nodes, reps
+
+    def _build_analysis_tree(self):
+        # At stage g, every node at level g-1(the parent) is filtered by the kernels of its children at level g, all
+        # of which share the Chebyshev basis of the parent. The coefficients are laid out as B(slots) x P(parents)*Ci
+        # for the shared-input mode of cheby_recurrence, wherein B is the maximal number of children of a parent.
+        nodes, reps = self.kernel_tree(self.kernel_a)
+        tree = []
+        parent_node = np.zeros(self.Co, dtype=np.int64)  # the root
+        for g in range(self.M):
+            parent = parent_node[reps[g]]  # the parent of every node at level g
+            slot = np.zeros_like(parent)
+            for p in np.unique(parent):
+                slot[parent == p] = np.arange((parent == p).sum())
+            P = int(parent_node.max()) + 1
+            coeff = self.coefficient_a.new_zeros(int(slot.max()) + 1, P, self.Ci, self.coefficient_a.size(-1))
+            slot, parent = torch.as_tensor(slot, device=self.device), torch.as_tensor(parent, device=self.device)
+            coeff[slot, parent] = self.coefficient_a[g][torch.as_tensor(reps[g], device=self.device)]
+            tree.append((cheby_trim(coeff.view(-1, P * self.Ci, coeff.size(-1))), slot, parent))
+            parent_node = nodes[g]
+        return tree, torch.as_tensor(nodes[-1], device=self.device)
+
+    def _build_synthesis_tree(self):
+        # Stages run in the order M-1,...,0, and the stages 0,...,g-1 left after stage g are shared by the channels of
+        # a node at level g-1. Hence the signals of the nodes at level g are filtered at stage g and then summed into
+        # their parents, and only the sum over channels benefits.
+        nodes, reps = self.kernel_tree(self.kernel_s)
+        tree = []
+        for g in range(self.M - 1, -1, -1):
+            coeff = cheby_trim(self.coefficient_s[g][torch.as_tensor(reps[g], device=self.device)])  # D x Ci x K+1
+            parent = nodes[g - 1][reps[g]] if g > 0 else np.zeros(len(reps[g]), dtype=np.int64)
+            tree.append((coeff, torch.as_tensor(parent, device=self.device), int(parent.max()) + 1))
+        return tree, torch.as_tensor(nodes[-1], device=self.device)
+
     def parse_kernels(self, raw_kernels):
         if raw_kernels is None:
             kernel = self.kernel_array_from_beta_dist(meyer_kernel, meyer_mirror_kernel)
@@ -131,35 +208,117 @@ class QmfCore:
             raise RuntimeError("{} input channels expected, but got {}".format(self.Ci, x.shape[-1]))
         return x.to(self.dtype)
 
-    def _analyze(self, x):
-        y = x  # Co x N x Ci
-        for g in range(self.M):
-            if self.zeroDC:
-                y = self.bptD05[g].pow(-1) * y
-            y = cheby_op(y, self.bptL[g], self.coefficient_a[g], lam_max=self.lam_max)
-        mask = self.channel_mask.unsqueeze(-1)  # Co x N --> Co x N x 1 for broadcast 'masked_fill_'
+    def _analyze(self, x, compact=False):
+        # Signals stay in the node-major layout N x D x Ci across all M stages so that every Chebyshev step is a
+        # single multi-RHS SpMM, see `cheby_recurrence`.
+        if x.size(0) == 1:
+            # Channels sharing a prefix of kernels are identical so far, hence only the D distinct nodes at every
+            # level of the kernel tree are computed, and every stage runs the Chebyshev basis of the parents only,
+            # i.e., 1+2+...+2^(M-1) instead of 1+(M-1)*2^M channel-passes for the default kernels.
+            y = x[0].unsqueeze(1)  # N x 1(the root) x Ci
+            for g, (coeff, slot, parent) in enumerate(self._analysis_tree):
+                N, P, Ci = y.shape
+                y = cheby_recurrence(y.reshape(N, P * Ci), scaled_laplace(self.bptL[g], self.lam_max), coeff,
+                                     right=self.bptD05_inv[g] if self.zeroDC else None)
+                y = y.view(N, -1, P, Ci)[:, slot, parent]  # N x B x P x Ci --> N x D x Ci
+            y = y.index_select(1, self._analysis_leaf)  # N x Co x Ci
+        else:  # distinct signals per channel
+            y = x.permute(1, 0, 2)
+            for g in range(self.M):
+                y = cheby_recurrence(y, scaled_laplace(self.bptL[g], self.lam_max), cheby_trim(self.coefficient_a[g]),
+                                     right=self.bptD05_inv[g] if self.zeroDC else None)
+        if compact:  # gather the coefficient of every node in its own channel
+            sizes = self.channel_ptr[1:] - self.channel_ptr[:-1]
+            channel = torch.repeat_interleave(torch.arange(self.Co, device=self.device), sizes)
+            return PackedCoefficients(y[self.channel_perm, channel], self.channel_perm, self.channel_ptr)
+        mask = self.channel_mask.t().unsqueeze(-1)  # Co x N --> N x Co x 1 for broadcast 'masked_fill_'
         y.masked_fill_(~mask, 0)
-        return y
-
-    def analyze(self, x):
+        return y.permute(1, 0, 2).contiguous()  # Co x N x Ci
+
+    def analyze(self, x, compact=False):
+        """
+        Parameters
+        ----------
+        x:  Tensor
+            The :obj:`(N,)` or :obj:`(N,Ci)` signals.
+        compact:    bool
+            If True, return the critically sampled :class:`PackedCoefficients` that keeps only the :obj:`(N,Ci)`
+            coefficients of nodes in their own channels instead of the dense :obj:`(Co,N,Ci)` tensor which is zero
+            out of :obj:`channel_mask`.
+
+        Returns
+        -------
+        Tensor, PackedCoefficients
+        """
         x = self._check_signal(x)
-        return self._analyze(x)
-
-    def _synthesize(self, y):
-        z = y
+        return self._analyze(x, compact)
+
+    def _synthesize(self, y, reduce=False):
+        if isinstance(y, PackedCoefficients):
+            y = y.to_dense()
+        z = y[0] if y.size(0) == 1 else y.permute(1, 0, 2)  # node-major, see _analyze
+        if reduce:
+            z = z.unsqueeze(1).expand(-1, self.Co, -1) if z.dim() == 2 else z
+            D = len(self._synthesis_tree[0][0])
+            z = z.new_zeros(z.size(0), D, z.size(2)).index_add_(1, self._synthesis_leaf, z)  # N x D x Ci
+            for g, (coeff, parent, P) in zip(range(self.M - 1, -1, -1), self._synthesis_tree):
+                z = cheby_recurrence(z, scaled_laplace(self.bptL[g], self.lam_max), coeff,
+                                     left=self.bptD05[g] if self.zeroDC else None)  # N x D x Ci
+                z = z.new_zeros(z.size(0), P, z.size(2)).index_add_(1, parent, z)  # N x P x Ci, into parents
+            return z.permute(1, 0, 2).contiguous()  # 1 x N x Ci
         for g in range(self.M - 1, -1, -1):  # M-1, M-2, ..., 0 totally M bipartite graphs
-            z = cheby_op(z, self.bptL[g], self.coefficient_s[g], lam_max=self.lam_max)
-            if self.zeroDC:
-                z = self.bptD05[g] * z
-        return z  # Co x N x Ci
-
-    def synthesize(self, y):
-        y = self._check_signal(y)
-        return self._synthesize(y)
+            z = cheby_recurrence(z, scaled_laplace(self.bptL[g], self.lam_max), cheby_trim(self.coefficient_s[g]),
+                                 left=self.bptD05[g] if self.zeroDC else None)
+        return z.permute(1, 0, 2).contiguous()  # Co x N x Ci
+
+    def synthesize(self, y, reduce=False):
+        """
+        Parameters
+        ----------
+        y:  Tensor, PackedCoefficients
+            The :obj:`(Co,N,Ci)` coefficients, :obj:`(N,Ci)` ones shared by all channels, or the packed ones given by
+            :py:meth:`analyze` with :obj:`compact=True`.
+        reduce: bool
+            If True, return the reconstruction, i.e., the sum over channels, which is computed on the prefix tree of
+            synthesis kernels(see :py:meth:`kernel_tree`) in about :obj:`2^(M+1)` instead of :obj:`M*2^M`
+            channel-passes.
+
+        Returns
+        -------
+        Tensor
+            The :obj:`(Co,N,Ci)` reconstruction of every channel, or :obj:`(1,N,Ci)` if :obj:`reduce`.
+        """
+        if not isinstance(y, PackedCoefficients):
+            y = self._check_signal(y)
+        return self._synthesize(y, reduce)
 
 
 class QmfOperator:
-    def __init__(self, bptG, beta, order=24, lam_max=2., device=None):
+    r"""
+    The explicit sparse analysis operator of a QMF filterbank, applied by a single SpMM.
+
+    Parameters
+    ----------
+    bptG:   list
+        The :obj:`M` bipartite adjacency matrices(spmatrix, Tensor or SparseTensor).
+    beta:   array, Tensor
+        The :obj:`(N,M)` bipartite partition indicators.
+    order:  int
+        The order of Chebyshev approximation.
+    lam_max:    float
+    device: torch.device, optional
+    mode:   str
+        :obj:`"scipy"`: the exact operator by sparse matrix products in scipy(single-threaded).
+        :obj:`"torch"`: the operator by sparse-sparse products of torch_sparse on :obj:`device`, with the intra-op
+        threads of torch, whose fill-in is bounded by :obj:`tol` and :obj:`max_nnz`, see
+        :func:`thgsp.filters.approximation.cheby_op_basis_sparse`.
+    tol:    float
+        The magnitude below which entries are dropped in the :obj:`"torch"` mode.
+    max_nnz:    int, optional
+        The maximal number of nonzeros per row of every intermediate matrix in the :obj:`"torch"` mode.
+    """
+
+    def __init__(self, bptG, beta, order=24, lam_max=2., device=None, mode="scipy", tol=0., max_nnz=None):
         N, M = beta.shape
         assert len(bptG) == M
 
@@ -167,22 +326,36 @@ class QmfOperator:
         self.order = order
         self.device = device
         self.lam_max = lam_max
+        self.bptG = bptG
+        self.beta = beta
 
         krn = np.array([[[meyer_kernel],
                          [meyer_mirror_kernel]]])  # 1(n_graph) x 2(Cout) x 1(Cin) kernel
-        coeff = cheby_coeff(krn, K=order, lam_max=lam_max).squeeze_()  # (1,2,1,K) --> (2,K)
-
-        operator = self.compute_basis(bptG, coeff, beta, lam_max)
-        self.operator = SparseTensor.from_scipy(operator).to(device)
+        self.coeff = cheby_coeff(krn, K=order, lam_max=lam_max).squeeze_()  # (1,2,1,K) --> (2,K)
 
+        self.operator = self.build(bptG, self.coeff, beta, lam_max, device, mode, tol, max_nnz)
         self.dtype = self.operator.dtype()
         self.device = self.operator.device()
 
+    @staticmethod
+    def build(bptG, coeff, beta, lam_max, device=None, mode="scipy", tol=0., max_nnz=None) -> SparseTensor:
+        if mode == "scipy":
+            return SparseTensor.from_scipy(QmfOperator.compute_basis(bptG, coeff, beta, lam_max)).to(device)
+        elif mode == "torch":
+            bptG = [to_torch_sparse(B).to(device) for B in bptG]
+            return QmfOperator.compute_basis_sparse(bptG, coeff, beta, lam_max, tol, max_nnz)
+        else:
+            raise RuntimeError("{} is not a valid mode of basis construction".format(mode))
+
+    @property
+    def nnz(self) -> int:
+        return self.operator.nnz()
+
     def transform(self, x):
-        return self.operator @ x
+        return spmm(self.operator, x)
 
     def inverse_transform(self, y):
-        return self.operator.t() @ y
+        return spmm(self.operator.t(), y)
 
     @staticmethod
     def compute_basis(bptG, coeff, beta, lam_max):
@@ -207,24 +380,61 @@ class QmfOperator:
         Ta *= 0.5 ** M
         return Ta
 
+    @staticmethod
+    def _row_coefficients(coeff, beta, i):
+        # the rows of nodes with beta=1 are those of H0, otherwise H1, hence one recurrence per stage
+        index = torch.as_tensor(np.asarray(beta)[:, i] == 0, dtype=torch.long)
+        return coeff[index.to(coeff.device)]  # N x K+1
+
+    @staticmethod
+    def compute_basis_sparse(bptG: List[SparseTensor], coeff, beta, lam_max, tol=0., max_nnz=None) -> SparseTensor:
+        """
+        The torch-native counterpart of :py:meth:`compute_basis`, whose every intermediate matrix is truncated by
+        :obj:`tol` and :obj:`max_nnz`.
+        """
+        Ta = None
+        for i, B in enumerate(bptG):
+            L = thgsp_laplace(B, "sym")
+            c = QmfOperator._row_coefficients(coeff.to(L.device()), beta, i)
+            Ta_sub = cheby_op_basis_sparse(L, c, lam_max, tol, max_nnz)
+            Ta = Ta_sub if Ta is None else sparse_truncate(Ta_sub @ Ta, tol, max_nnz)
+        return Ta
+
+    @staticmethod
+    def operator_error(operator: SparseTensor, bptG, coeff, beta, lam_max, num_probes=8) -> float:
+        """
+        Estimate the relative error :math:`\\|T_ax-\\hat{T}_ax\\|_F/\\|T_ax\\|_F` of the explicit operator
+        :math:`\\hat{T}_a` with :obj:`num_probes` random signals, wherein :math:`T_ax` is computed matrix-free by
+        Chebyshev recurrences.
+        """
+        N, dtype, device = operator.size(0), operator.dtype(), operator.device()
+        x = torch.randn(N, num_probes, dtype=dtype, device=device)
+        y = x
+        for i, B in enumerate(bptG):
+            L = thgsp_laplace(to_torch_sparse(B).to(dtype).to(device), "sym")
+            c = QmfOperator._row_coefficients(coeff.to(dtype).to(device), beta, i)  # N x K+1
+            c = c.view(N, 1, 1, -1).expand(-1, -1, num_probes, -1)  # N x 1 x num_probes x K+1, shared by probes
+            y = cheby_recurrence(y, scaled_laplace(L, lam_max), c)[:, 0]
+        return ((spmm(operator, x) - y).norm() / y.norm()).item()
+
+    def approximation_error(self, num_probes=8) -> float:
+        """
+        The relative error of :obj:`operator`, see :py:meth:`operator_error`.
+        """
+        return self.operator_error(self.operator, self.bptG, self.coeff, self.beta, self.lam_max, num_probes)
+
     def __call__(self, x):
         return self.transform(x)
 
 
 class BiorthOperator:
-    def __init__(self, bptG, beta, k=4, lam_max=2., device=None):
-        h0_c, g0_c, orthogonality = design_biorth_kernel(k)
-        h0 = partial(polyval, torch.from_numpy(h0_c))
-        h0.__name__ = 'h0'
-        g0 = partial(polyval, torch.from_numpy(g0_c))
-        g0.__name__ = 'g0'
-
-        def h1(x):
-            return g0(2 - x)
-
-        def g1(x):
-            return h0(2 - x)
+    """
+    The explicit sparse analysis and synthesis operators of a biorthogonal filterbank, see :class:`QmfOperator` for
+    the parameters.
+    """
 
+    def __init__(self, bptG, beta, k=4, lam_max=2., device=None, mode="scipy", tol=0., max_nnz=None):
+        h0, h1, g0, g1, orthogonality = biorth_kernels(k)  # shared objects, hence cached coefficients
         self.orthogonality = orthogonality
         self.analysis_krn = np.array([[[h0],
                                        [h1]]])
@@ -232,31 +442,50 @@ class BiorthOperator:
         self.synthesis_krn = np.array([[[g0],
                                         [g1]]])
 
-        ana_coeff = cheby_coeff(self.analysis_krn, K=2 * k, lam_max=lam_max).squeeze_()  # (1,2,1,K) --> (2,K)
+        self.ana_coeff = cheby_coeff(self.analysis_krn, K=2 * k, lam_max=lam_max).squeeze_()  # (1,2,1,K) --> (2,K)
+        self.syn_coeff = cheby_coeff(self.synthesis_krn, K=2 * k, lam_max=lam_max).squeeze_()  # (1,2,1,K) --> (2,K)
+
+        self.operator = QmfOperator.build(bptG, self.ana_coeff, beta, lam_max, device, mode, tol, max_nnz)
+        self.inv_operator = QmfOperator.build(bptG, self.syn_coeff, beta, lam_max, device, mode, tol, max_nnz)
 
-        syn_coeff = cheby_coeff(self.synthesis_krn, K=2 * k, lam_max=lam_max).squeeze_()  # (1,2,1,K) --> (2,K)
-        operator = QmfOperator.compute_basis(bptG, ana_coeff, beta, lam_max)
-        self.operator = SparseTensor.from_scipy(operator).to(device)
-        inv_operator = QmfOperator.compute_basis(bptG, syn_coeff, beta, lam_max)
-        self.inv_operator = SparseTensor.from_scipy(inv_operator).to(device)
+        self.N, self.M = beta.shape
+        self.bptG, self.beta, self.lam_max = bptG, beta, lam_max
+        self.dtype = self.operator.dtype()
+        self.device = self.operator.device()
+
+    @property
+    def nnz(self):
+        """
+        The numbers of nonzeros of the analysis and synthesis operators.
+        """
+        return self.operator.nnz(), self.inv_operator.nnz()
+
+    def approximation_error(self, num_probes=8):
+        """
+        The relative errors of the analysis and synthesis operators, see :py:meth:`QmfOperator.operator_error`.
+        """
+        error = partial(QmfOperator.operator_error, bptG=self.bptG, beta=self.beta, lam_max=self.lam_max,
+                        num_probes=num_probes)
+        return error(self.operator, coeff=self.ana_coeff), error(self.inv_operator, coeff=self.syn_coeff)
 
     def transform(self, x):
-        return self.operator @ x
+        return spmm(self.operator, x)
 
     def inverse_transform(self, y):
-        return self.inv_operator.t() @ y
+        return spmm(self.inv_operator.t(), y)
 
 
 class ColorQmf(QmfCore):
     def __init__(self, G: Graph, kernel=None, in_channels=1, order=24, strategy="harary", vtx_color=None, lam_max=2.,
-                 zeroDC=False, **kwargs):
+                 zeroDC=False, tol=1e-6, damping=None, **kwargs):
         self.adj = G
         self.strategy = strategy
 
         if strategy is "harary":
-            bptG, beta, beta_dist, vtx_color, mapper = harary(self.adj, vtx_color=vtx_color, **kwargs)
+            bptG, beta, beta_dist, vtx_color, mapper = cached_decomposition(harary, self.adj, vtx_color=vtx_color,
+                                                                            **kwargs)
         elif strategy is "osglm":
-            bptG, beta, append_nodes, vtx_color = osglm(self.adj, vtx_color=vtx_color, **kwargs)
+            bptG, beta, append_nodes, vtx_color = cached_decomposition(osglm, self.adj, vtx_color=vtx_color, **kwargs)
             self.append_nodes = append_nodes
         else:
             raise RuntimeError("{} is not a valid color-based decomposition algorithm.".format(str(strategy)))
@@ -265,18 +494,18 @@ class ColorQmf(QmfCore):
         bptG = [SparseTensor.from_scipy(B).to(G.device()) for B in bptG]
 
         super(ColorQmf, self).__init__(bptG, beta, analyze_kernels=kernel, in_channels=in_channels,
-                                       order=order, lam_max=lam_max, zeroDC=zeroDC)
+                                       order=order, lam_max=lam_max, zeroDC=zeroDC, tol=tol, damping=damping)
         self.N = self.adj.size(-1)  # osglm compatible
 
-    def analyze(self, x):
+    def analyze(self, x, compact=False):
         x = self._check_signal(x)
         if self.strategy is "osglm":
             x_append = x[:, self.append_nodes, :]
             x = torch.cat([x, x_append], 1)
-        return self._analyze(x)
+        return self._analyze(x, compact)
 
-    def synthesize(self, y):
-        z = self._synthesize(y)
+    def synthesize(self, y, reduce=False):
+        z = self._synthesize(y, reduce)
         if self.strategy is "osglm":
             z = z[:, :self.N, :]
         return z
@@ -284,7 +513,7 @@ class ColorQmf(QmfCore):
 
 class NumQmf(QmfCore):
     def __init__(self, G, kernel=None, in_channels=1, order=24, strategy: str = "admm", M=1, lam_max=2., zeroDC=False,
-                 **kwargs):
+                 tol=1e-6, damping=None, **kwargs):
         self.adj = G
         N = self.adj.size(-1)
 
@@ -316,26 +545,16 @@ class NumQmf(QmfCore):
                 "{} is not a valid numerical decomposition algorithm supported at present.".format(str(strategy)))
 
         super(NumQmf, self).__init__(bptG, beta, analyze_kernels=kernel, in_channels=in_channels, order=order,
-                                     lam_max=lam_max, zeroDC=zeroDC)
+                                     lam_max=lam_max, zeroDC=zeroDC, tol=tol, damping=damping)
 
 
 class BiorthCore(QmfCore):
-    def __init__(self, bptG, beta, k=8, in_channels=1, order=16, lam_max=2., zeroDC=False):
-        h0_c, g0_c, orthogonality = design_biorth_kernel(k)
-        h0 = partial(polyval, torch.from_numpy(h0_c))
-        h0.__name__ = 'h0'
-        g0 = partial(polyval, torch.from_numpy(g0_c))
-        g0.__name__ = 'g0'
-
-        def h1(x):
-            return g0(2 - x)
-
-        def g1(x):
-            return h0(2 - x)
-
+    def __init__(self, bptG, beta, k=8, in_channels=1, order=16, lam_max=2., zeroDC=False, tol=1e-6, damping=None):
+        h0, h1, g0, g1, orthogonality = biorth_kernels(k)  # shared objects, hence cached coefficients
         self.orthogonality = orthogonality
         super(BiorthCore, self).__init__(bptG, beta, analyze_kernels=(h0, h1), synthesis_kernels=(g0, g1),
-                                         in_channels=in_channels, order=order, lam_max=lam_max, zeroDC=zeroDC)
+                                         in_channels=in_channels, order=order, lam_max=lam_max, zeroDC=zeroDC,
+                                         tol=tol, damping=damping)
 
     def __repr__(self):
         info = super().__repr__()
@@ -345,15 +564,16 @@ class BiorthCore(QmfCore):
 
 class ColorBiorth(BiorthCore):
     def __init__(self, G: Graph, k=8, in_channels=1, order=16, strategy="harary", vtx_color=None, lam_max=2.,
-                 zeroDC=False, **kwargs):
+                 zeroDC=False, tol=1e-6, damping=None, **kwargs):
         self.adj = G
         self.lam_max = lam_max
         self.strategy = strategy
 
         if strategy is "harary":
-            bptG, beta, beta_dist, vtx_color, mapper = harary(self.adj, vtx_color=vtx_color, **kwargs)
+            bptG, beta, beta_dist, vtx_color, mapper = cached_decomposition(harary, self.adj, vtx_color=vtx_color,
+                                                                            **kwargs)
         elif strategy is "osglm":
-            bptG, beta, append_nodes, vtx_color = osglm(self.adj, vtx_color=vtx_color, **kwargs)
+            bptG, beta, append_nodes, vtx_color = cached_decomposition(osglm, self.adj, vtx_color=vtx_color, **kwargs)
             self.append_nodes = append_nodes
         else:
             raise RuntimeError("{} is not a valid color-based decomposition algorithm.".format(str(strategy)))
@@ -361,25 +581,26 @@ class ColorBiorth(BiorthCore):
 
         bptG = [SparseTensor.from_scipy(B).to(G.device()) for B in bptG]
 
-        super(ColorBiorth, self).__init__(bptG, beta, k, in_channels, order, lam_max, zeroDC)
+        super(ColorBiorth, self).__init__(bptG, beta, k, in_channels, order, lam_max, zeroDC, tol, damping)
         self.N = self.adj.size(-1)  # osglm compatible
 
-    def analyze(self, x):
+    def analyze(self, x, compact=False):
         x = self._check_signal(x)
         if self.strategy is "osglm":
             x_append = x[:, self.append_nodes, :]
             x = torch.cat([x, x_append], 1)
-        return self._analyze(x)
+        return self._analyze(x, compact)
 
-    def synthesize(self, y):
-        z = self._synthesize(y)
+    def synthesize(self, y, reduce=False):
+        z = self._synthesize(y, reduce)
         if self.strategy is "osglm":
             z = z[:, :self.N, :]
         return z
 
 
 class NumBiorth(BiorthCore):
-    def __init__(self, G, k=8, in_channels=1, order=16, strategy="admm", M=1, lam_max=2., zeroDC=False, **kwargs):
+    def __init__(self, G, k=8, in_channels=1, order=16, strategy="admm", M=1, lam_max=2., zeroDC=False, tol=1e-6,
+                 damping=None, **kwargs):
         self.adj = G
         N = self.adj.size(-1)
         self.lam_max = lam_max
@@ -411,4 +632,4 @@ class NumBiorth(BiorthCore):
             raise RuntimeError(
                 "{} is not a valid numerical decomposition algorithm supported at present.".format(str(strategy)))
 
-        super(NumBiorth, self).__init__(bptG, beta, k, in_channels, order, lam_max, zeroDC)
+        super(NumBiorth, self).__init__(bptG, beta, k, in_channels, order, lam_max, zeroDC, tol, damping)
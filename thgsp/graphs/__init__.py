@@ -1,19 +1,30 @@
+from .cache import SpectralCache
 from .core import GraphBase, Graph, DiGraph
+from .batch import GraphBatch
 from .degree import out_degree, in_degree
 from .generators import rand_bipartite, rand_udg, rand_dg, random_graph, random_bgraph, radius, knn
 from .is_bipartite import is_bipartite
-from .laplace import laplace
+from .laplace import laplace, LaplacianOperator
+from .reduction import kron_reduction
+from .fingerprint import fingerprint
+from .store import EigenStore
 
 __all__ = [
     # graphs
     'GraphBase',
     'Graph',
     'DiGraph',
+    'GraphBatch',
     # utils
     'out_degree',
     'in_degree',
     'is_bipartite',
     'laplace',
+    'kron_reduction',
+    'LaplacianOperator',
+    'SpectralCache',
+    'EigenStore',
+    'fingerprint',
     # generators
     'rand_udg',
     'rand_dg',
@@ -0,0 +1,142 @@
+from typing import List, Optional
+
+import torch
+from torch_sparse import SparseTensor
+
+from .core import GraphBase
+from .degree import in_degree
+from .eigen import estimate_lambda_max_batch
+
+
+class GraphBatch(GraphBase):
+    r"""
+    A batch of graphs of possibly different sizes as one graph, whose adjacency is the block-diagonal concatenation of
+    the adjacencies. Hence a single sparse multiplication(and a single Chebyshev recurrence) processes all graphs,
+    avoiding the Python overhead of filtering many small graphs one by one. Nodes of the :obj:`b`-th graph are
+    :obj:`ptr[b]:ptr[b+1]` of the batch.
+
+    Parameters
+    ----------
+    graphs: list
+        The :class:`GraphBase` instances to batch, which share the data type and device.
+    cache:  bool
+    requires_grad:  bool
+    cache_budget:   int, optional
+        See :class:`GraphBase`.
+
+    Attributes
+    ----------
+    ptr:    Tensor
+        Shape: :obj:`(B+1,)`. The offsets of graphs in the batch.
+    batch:  Tensor
+        Shape: :obj:`(N,)`. The index of the graph every node belongs to.
+    graphs: list
+        The batched graphs.
+    """
+
+    def __init__(self, graphs: List[GraphBase], cache=False, requires_grad=False,
+                 cache_budget: Optional[int] = None):
+        assert len(graphs) > 0
+        self.graphs = list(graphs)
+        sizes = [g.n_node for g in self.graphs]
+        ptr = [0]
+        for n in sizes:
+            ptr.append(ptr[-1] + n)
+        N = ptr[-1]
+
+        rows, cols, values = [], [], []
+        for g, offset in zip(self.graphs, ptr[:-1]):
+            row, col, value = g.coo()
+            rows.append(row + offset)
+            cols.append(col + offset)
+            values.append(value if value is not None else row.new_ones(row.shape, dtype=g.dtype()))
+        adj = SparseTensor(row=torch.cat(rows), col=torch.cat(cols), value=torch.cat(values), sparse_sizes=(N, N),
+                           is_sorted=True)  # blocks are sorted and placed in order
+
+        coords = None
+        if all(g.coords is not None for g in self.graphs):
+            coords = torch.cat([g.coords for g in self.graphs])
+        super(GraphBatch, self).__init__(adj, coords, cache, requires_grad, cache_budget)
+        self._is_directed = any(g.is_directed for g in self.graphs)
+
+        device = self.device()
+        self.ptr = torch.as_tensor(ptr, device=device)
+        self.batch = torch.repeat_interleave(torch.as_tensor(sizes, device=device))
+
+    @property
+    def num_graphs(self) -> int:
+        return len(self.graphs)
+
+    @property
+    def graph_sizes(self) -> List[int]:
+        """
+        The numbers of nodes of the batched graphs.
+        """
+        return [g.n_node for g in self.graphs]
+
+    def split(self, x: torch.Tensor, dim: int = -2) -> List[torch.Tensor]:
+        """
+        Split signals on the batch into the views of per-graph signals.
+
+        Parameters
+        ----------
+        x:  Tensor
+            The signals whose :obj:`dim`-th dimension is of size :obj:`N`, e.g., the :obj:`(Co,N,Ci)` output of
+            :class:`thgsp.filters.Filter`.
+        dim:    int
+            The node dimension.
+
+        Returns
+        -------
+        list
+            :obj:`B` tensors, the :obj:`b`-th of which has :obj:`ptr[b+1]-ptr[b]` nodes.
+        """
+        assert x.size(dim) == self.n_node
+        return list(torch.split(x, self.graph_sizes, dim))
+
+    def max_frequencies(self, lap_type: str = "sym", method: str = "power") -> torch.Tensor:
+        """
+        The estimates of the largest graph frequency of every batched graph, cached per Laplacian type and method.
+
+        Parameters
+        ----------
+        lap_type:   str
+            See :py:meth:`GraphBase.max_frequency`.
+        method: str
+            :obj:`"power"` or :obj:`"gershgorin"` estimate all graphs at once on the block-diagonal Laplacian of the
+            batch, see :func:`thgsp.graphs.eigen.estimate_lambda_max_batch`. :obj:`"lanczos"` runs an eigensolver
+            per graph, whose results are cached by the graphs themselves.
+
+        Returns
+        -------
+        Tensor
+            Shape: :obj:`(B,)`.
+        """
+        if method == "lanczos":
+            return torch.as_tensor([g.max_frequency(lap_type, method) for g in self.graphs], dtype=self.dtype(),
+                                   device=self.device())
+        key = ("batch", lap_type, method)
+        if key not in self._lam_max:
+            lap = self.L("sym" if lap_type == "rw" else lap_type).to_symmetric(reduce="mean")
+            self._lam_max[key] = estimate_lambda_max_batch(lap, self.batch, self.num_graphs, method)
+        return self._lam_max[key]
+
+    def max_frequency(self, lap_type: str = "sym", method: str = "power"):
+        """
+        The largest graph frequency of the batch, i.e., the maximum of :py:meth:`max_frequencies`.
+        """
+        return self.max_frequencies(lap_type, method).max().item()
+
+    def degree(self, bunch=None):
+        return in_degree(self, bunch)
+
+    @property
+    def is_directed(self):
+        return self._is_directed
+
+    def n_edge(self):
+        return sum(g.n_edge() for g in self.graphs)
+
+    def __repr__(self):
+        return "{}(num_graphs={}, n_node={}, nnz={})".format(self.__class__.__name__, self.num_graphs, self.n_node,
+                                                             self.nnz())
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from typing import Optional
+
+import torch
+from torch_sparse import SparseTensor
+
+
+def nbytes(obj) -> int:
+    """
+    The number of bytes held by tensors in :obj:`obj`, which can be a :class:`Tensor`, a :class:`SparseTensor`
+    or a tuple(list) of them. Other objects count as zero.
+    """
+    if isinstance(obj, torch.Tensor):
+        return obj.numel() * obj.element_size()
+    if isinstance(obj, SparseTensor):
+        storage = obj.storage
+        return sum(nbytes(t) for t in (storage._row, storage._rowptr, storage._col, storage._value))
+    if isinstance(obj, (tuple, list)):
+        return sum(nbytes(o) for o in obj)
+    return 0
+
+
+class SpectralCache:
+    """
+    A least-recently-used(LRU) cache of Laplacians and eigenpairs bounded by a memory budget.
+
+    Parameters
+    ----------
+    max_bytes:  int, optional
+        The memory budget in bytes. When exceeded, the least recently used entries are evicted. :obj:`None` means
+        unlimited and :obj:`0` disables caching. An entry larger than the budget is never stored.
+
+    Attributes
+    ----------
+    hits:   int
+        The number of lookups that found an entry.
+    misses: int
+        The number of lookups that found nothing.
+    evictions:  int
+        The number of entries evicted to respect the budget.
+    nbytes: int
+        The number of bytes held by all entries.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        assert max_bytes is None or max_bytes >= 0
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._sizes = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        size = nbytes(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+        self.pop(key)
+        self._data[key] = value
+        self._sizes[key] = size
+        self.nbytes += size
+        while self.max_bytes is not None and self.nbytes > self.max_bytes:
+            old_key, _ = self._data.popitem(last=False)
+            self.nbytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+        return value
+
+    def pop(self, key, default=None):
+        if key not in self._data:
+            return default
+        self.nbytes -= self._sizes.pop(key)
+        return self._data.pop(key)
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes, "keys": list(self._data.keys())}
+
+    def __repr__(self):
+        return "{}(entries={}, nbytes={}, max_bytes={}, hits={}, misses={}, evictions={})".format(
+            self.__class__.__name__, len(self), self.nbytes, self.max_bytes, self.hits, self.misses, self.evictions)
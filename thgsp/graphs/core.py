@@ -2,16 +2,39 @@ from typing import Optional
 
 import networkx as nx
 import torch
-from scipy.sparse.linalg import eigsh
 
 from thgsp.convert import to_torch_sparse, SparseTensor
+from .cache import SpectralCache
 from .degree import in_degree, out_degree
+from .eigen import partial_eigh, estimate_lambda_max
 from .is_bipartite import is_bipartite
 from .laplace import laplace
+from .fingerprint import fingerprint
+from .store import EigenStore
 
 
 class GraphBase(SparseTensor):
-    def __init__(self, adjacency, coords: Optional[torch.Tensor] = None, cache=False, requires_grad=False):
+    def __init__(self, adjacency, coords: Optional[torch.Tensor] = None, cache=False, requires_grad=False,
+                 cache_budget: Optional[int] = None, store=None):
+        r"""
+        Parameters
+        ----------
+        adjacency:  Tensor, array, spmatrix, SparseTensor
+            The :obj:`(N,N)` adjacency matrix.
+        coords: Tensor, optional
+            The :obj:`(N,D)` coordinates of nodes.
+        cache:  bool
+            If True, Laplacians and eigenpairs are cached, keyed by the Laplacian type, data type, device and the
+            number of computed eigenpairs, so that repeated filtering does not redo eigendecompositions.
+        requires_grad:  bool
+            If True, track gradients w.r.t. the edge weights.
+        cache_budget:   int, optional
+            The memory budget(in bytes) of the cache, beyond which the least recently used entries are evicted.
+            :obj:`None` means unlimited. Ignored if :obj:`cache` is False.
+        store:  EigenStore, str, optional
+            A persistent :class:`EigenStore`(or its root directory) consulted before any eigendecomposition, and
+            updated after it, so that eigenbases survive process restarts and are memory-mapped across processes.
+        """
 
         try:  # torch.Tensor, np.ndarray, scipy.spmatrix
             M, N = adjacency.shape
@@ -25,6 +48,7 @@ class GraphBase(SparseTensor):
         self._n_node = N
         self.coords = coords
         self.cache = cache
+        self.store = EigenStore(store) if isinstance(store, str) else store
 
         adj = to_torch_sparse(adjacency)
         row, col, value = adj.coo()
@@ -34,10 +58,9 @@ class GraphBase(SparseTensor):
         self.requires_grad_(requires_grad)
 
         # cached members
-        self._lap_type = None
-        self._L = None
-        self._fs = None
-        self._U = None
+        self._spectral_cache = SpectralCache(cache_budget if cache else 0)
+        self._lam_max = {}
+        self._fingerprint = None
 
     @property
     def n_node(self) -> int:
@@ -49,47 +72,112 @@ class GraphBase(SparseTensor):
         val = val.clone()
         return edge_idx, val
 
+    def fingerprint(self) -> str:
+        """
+        The content hash of the adjacency, see :func:`thgsp.graphs.fingerprint`. It is computed once and memoized,
+        hence stale if edge weights are modified in-place afterwards.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(self)
+        return self._fingerprint
+
+    def cache_info(self) -> dict:
+        """
+        The statistics of the Laplacian and eigenpair cache: :obj:`hits`, :obj:`misses`, :obj:`evictions`,
+        :obj:`nbytes`, :obj:`max_bytes` and the cached :obj:`keys` from the least to the most recently used.
+        """
+        return self._spectral_cache.info()
+
+    def clear_cache(self):
+        self._spectral_cache.clear()
+        self._lam_max.clear()
+
     def L(self, lap_type: str = "sym"):
         assert lap_type in ["sym", "comb", "rw"]
-        if self._L is not None and lap_type is self._lap_type:
-            lap = self._L
-        else:
-            lap = laplace(self, lap_type)
-            if self.cache:
-                self._L = lap
-                self._lap_type = lap_type
+        key = ("L", lap_type, self.dtype(), self.device())
+        lap = self._spectral_cache.get(key)
+        if lap is None:
+            lap = self._spectral_cache.put(key, laplace(self, lap_type))
         return lap
 
-    def U(self, lap_type: str = "sym"):
-        lap = self.L(lap_type)
-        if self._U is not None:
-            U = self._U
-        else:
-            fs, U = torch.symeig(lap.to_dense(), eigenvectors=True)
-            if self.cache:
-                self._fs = fs
-                self._U = U
-        return U
+    def _eigh(self, lap_type: str = "sym", k: Optional[int] = None, which: str = "SA", eigenvectors=True):
+        key = ("eig", lap_type, self.dtype(), self.device(), k, which if k is not None else None)
+        cached = self._spectral_cache.get(key)
+        if cached is not None and (cached[1] is not None or not eigenvectors):
+            return cached
 
-    def spectrum(self, lap_type: str = "sym"):
-        lap = self.L(lap_type).to_symmetric(reduce="mean")
-        if self._fs is not None:
-            fs = self._fs
-        else:
-            fs, _ = torch.symeig(lap.to_dense(), eigenvectors=False)
-            if self.cache:
-                self._fs = fs
-        fs[fs.abs() < 1e-6] = 0  # for stability
-        return fs
+        if self.store is not None:
+            fs, U = self.store.load_spectral(self.fingerprint(), lap_type, k, which, self.dtype(), self.device())
+            if fs is not None and (U is not None or not eigenvectors):
+                return self._spectral_cache.put(key, (fs, U))
 
-    def max_frequency(self, lap_type: str = "sym"):
         lap = self.L(lap_type).to_symmetric(reduce="mean")
-        eigsh(lap.to_scipy(layout="csr"), k=1)
-
-    def spectral(self, lap_type: str = "sym"):
-        U = self.U(lap_type)
-        fs = self.spectrum(lap_type)
-        return fs, U
+        if k is None:  # complete eigendecomposition
+            fs, U = torch.symeig(lap.to_dense(), eigenvectors=eigenvectors)
+            U = U if eigenvectors else None
+        else:  # k low(which="SA") or high(which="LA") frequency eigenpairs
+            fs, U = partial_eigh(lap, k, which)
+        fs[fs.abs() < 1e-6] = 0  # for stability
+        if self.store is not None:
+            self.store.save_spectral(self.fingerprint(), fs, U, lap_type, k, which)
+        return self._spectral_cache.put(key, (fs, U))
+
+    def U(self, lap_type: str = "sym", k: Optional[int] = None, which: str = "SA"):
+        """
+        The graph Fourier basis, i.e., the eigenvectors of the Laplacian.
+
+        Parameters
+        ----------
+        lap_type:   str
+            One of :obj:`"sym"`, :obj:`"comb"` and :obj:`"rw"`.
+        k:  int, optional
+            If given, only compute :obj:`k` eigenvectors by a sparse iterative solver instead of a dense
+            eigendecomposition, which avoids the :obj:`O(N^2)` memory and :obj:`O(N^3)` time.
+        which:  str
+            :obj:`"SA"` for the :obj:`k` lowest frequencies and :obj:`"LA"` for the :obj:`k` highest ones. Ignored if
+            :obj:`k` is :obj:`None`.
+
+        Returns
+        -------
+        Tensor
+            Shape: :obj:`(N,N)` or :obj:`(N,k)`. Columns are sorted in ascending order of frequency.
+        """
+        return self._eigh(lap_type, k, which, eigenvectors=True)[1]
+
+    def spectrum(self, lap_type: str = "sym", k: Optional[int] = None, which: str = "SA"):
+        """
+        The graph frequencies in ascending order, see :py:meth:`U` for the parameters.
+        """
+        return self._eigh(lap_type, k, which, eigenvectors=False)[0]
+
+    def max_frequency(self, lap_type: str = "sym", method: str = "lanczos"):
+        """
+        Estimate the largest graph frequency :math:`\\lambda_{max}`, cached per Laplacian type and method.
+
+        Parameters
+        ----------
+        lap_type:   str
+            One of :obj:`"sym"`, :obj:`"comb"` and :obj:`"rw"`.
+        method: str
+            :obj:`"lanczos"`, :obj:`"power"` or :obj:`"gershgorin"`, see
+            :func:`thgsp.graphs.eigen.estimate_lambda_max` for details.
+
+        Returns
+        -------
+        float
+            An estimate that is no smaller than :math:`\\lambda_{max}` up to a tolerance. For :obj:`"rw"`, it bounds
+            the spectrum of :math:`D^{-1}L`, i.e., that of :obj:`"sym"`, rather than :obj:`spectrum("rw")`, which is
+            of the symmetrized :math:`(L_{rw}+L_{rw}^\\top)/2`.
+        """
+        key = (lap_type, method)
+        if key not in self._lam_max:
+            # L_rw = D^{-1/2} L_sym D^{1/2} shares the spectrum with the symmetric L_sym
+            lap = self.L("sym" if lap_type == "rw" else lap_type).to_symmetric(reduce="mean")
+            self._lam_max[key] = estimate_lambda_max(lap, method)
+        return self._lam_max[key]
+
+    def spectral(self, lap_type: str = "sym", k: Optional[int] = None, which: str = "SA"):
+        return self._eigh(lap_type, k, which, eigenvectors=True)
 
     def degree(self, bunch=None):
         raise NotImplementedError
@@ -129,9 +217,9 @@ class GraphBase(SparseTensor):
 class Graph(GraphBase):
     def __init__(self, adjacency,
                  coords: Optional[torch.Tensor] = None,
-                 cache=False, requires_grad=False):
+                 cache=False, requires_grad=False, cache_budget: Optional[int] = None, store=None):
         adj = to_torch_sparse(adjacency).to_symmetric(reduce='mean')
-        super(Graph, self).__init__(adj, coords, cache, requires_grad)
+        super(Graph, self).__init__(adj, coords, cache, requires_grad, cache_budget, store)
         self._is_directed = False
 
     def degree(self, bunch=None):
@@ -152,8 +240,8 @@ class Graph(GraphBase):
 class DiGraph(GraphBase):
     def __init__(self, adjacency,
                  coords: Optional[torch.Tensor] = None,
-                 cache=False, requires_grad=False):
-        super(DiGraph, self).__init__(adjacency, coords, cache, requires_grad)
+                 cache=False, requires_grad=False, cache_budget: Optional[int] = None, store=None):
+        super(DiGraph, self).__init__(adjacency, coords, cache, requires_grad, cache_budget, store)
         self._is_directed = True
 
     def in_degree(self, bunch=None):
@@ -0,0 +1,169 @@
+import torch
+from scipy.sparse.linalg import eigsh
+from torch_scatter import scatter_add, scatter_max
+from torch_sparse import SparseTensor
+
+
+def partial_eigh(lap: SparseTensor, k: int, which: str = "SA", method: str = "lanczos", tol: float = 0.):
+    r"""
+    Compute :obj:`k` extremal eigenpairs of a symmetric sparse matrix(usually a graph Laplacian) by an iterative
+    solver, without forming the dense :obj:`(N,N)` matrix.
+
+    Parameters
+    ----------
+    lap:    SparseTensor
+        The :obj:`(N,N)` symmetric matrix.
+    k:  int
+        The number of eigenpairs to compute, :obj:`0<k<N`.
+    which:  str
+        :obj:`"SA"` for the :obj:`k` smallest(low-frequency) eigenvalues and :obj:`"LA"` for the :obj:`k`
+        largest(high-frequency) ones.
+    method: str
+        :obj:`"lanczos"`: the implicitly restarted Lanczos method of ARPACK, run on CPU.
+        :obj:`"lobpcg"`: :func:`torch.lobpcg` on the device of :obj:`lap`, which requires :obj:`N>=3k`.
+    tol:    float
+        The relative accuracy of eigenvalues. :obj:`0` means the machine precision for :obj:`"lanczos"` and the
+        default tolerance of :func:`torch.lobpcg`.
+
+    Returns
+    -------
+    fs: Tensor
+        The :obj:`(k,)` eigenvalues in ascending order.
+    U:  Tensor
+        The :obj:`(N,k)` eigenvectors, the :obj:`i`-th column of which corresponds to :obj:`fs[i]`.
+    """
+    N = lap.size(-1)
+    assert 0 < k < N
+    if which not in ("SA", "LA"):
+        raise ValueError("which should be either 'SA' or 'LA', but got {}".format(which))
+    dtype, device = lap.dtype(), lap.device()
+
+    if method == "lanczos":
+        fs, U = eigsh(lap.to_scipy(layout="csr"), k=k, which=which, tol=tol)
+        fs = torch.from_numpy(fs).to(dtype=dtype, device=device)
+        U = torch.from_numpy(U).to(dtype=dtype, device=device)
+    elif method == "lobpcg":
+        A = lap.to_torch_sparse_coo_tensor()
+        fs, U = torch.lobpcg(A, k=k, largest=which == "LA", tol=tol if tol > 0 else None)
+    else:
+        raise RuntimeError("{} is not a supported eigensolver".format(method))
+
+    fs, idx = fs.sort()
+    return fs, U[:, idx]
+
+
+def estimate_lambda_max(lap: SparseTensor, method: str = "lanczos", tol: float = 5e-3, max_iter: int = 200,
+                        margin: float = 1.01) -> float:
+    r"""
+    Estimate the largest eigenvalue :math:`\lambda_{max}` of a sparse Laplacian.
+
+    Parameters
+    ----------
+    lap:    SparseTensor
+        The :obj:`(N,N)` Laplacian.
+    method: str
+        :obj:`"lanczos"`: ARPACK Lanczos iterations on the symmetric :obj:`lap`, run on CPU.
+        :obj:`"power"`: power iterations with the Rayleigh quotient, run on the device of :obj:`lap`.
+        :obj:`"gershgorin"`: the Gershgorin circle bound :math:`\max_i(l_{ii}+\sum_{j\neq i}|l_{ij}|)`, which is
+        a guaranteed upper bound and costs a single pass over the nonzeros, but usually looser than the others.
+    tol:    float
+        The relative tolerance of iterative methods.
+    max_iter:   int
+        The maximal number of power iterations.
+    margin: float
+        Iterative methods approach :math:`\lambda_{max}` from below, hence their estimates are multiplied by
+        :obj:`margin` to get an upper bound for Chebyshev approximation. Ignored by :obj:`"gershgorin"`.
+
+    Returns
+    -------
+    float
+        The estimated :math:`\lambda_{max}`.
+    """
+    N = lap.size(-1)
+    row, col, val = lap.coo()
+    val = col.new_ones(col.shape, dtype=lap.dtype()) if val is None else val
+    if method == "gershgorin":
+        radius = scatter_add(torch.where(row == col, val, val.abs()), row, dim=0, dim_size=N)
+        return radius.max().item()
+
+    if N <= 10:  # iterative solvers are unnecessary(and ARPACK fails) for tiny graphs
+        return torch.symeig(lap.to_dense().to(torch.double))[0][-1].item()
+
+    if method == "lanczos":
+        lam = eigsh(lap.to_scipy(layout="csr"), k=1, which="LA", tol=tol, ncv=min(N, 10),
+                    return_eigenvectors=False)[0]
+    elif method == "power":
+        with torch.no_grad():
+            x = torch.rand(N, 1, dtype=lap.dtype(), device=lap.device())
+            x /= x.norm()
+            lam = 0.
+            for _ in range(max_iter):
+                y = lap @ x
+                lam_new = (x * y).sum().item()  # Rayleigh quotient
+                norm = y.norm()
+                if norm == 0:
+                    break
+                x = y / norm
+                converged = abs(lam_new - lam) <= tol * abs(lam_new)
+                lam = lam_new
+                if converged:
+                    break
+    else:
+        raise RuntimeError("{} is not a supported method to estimate lambda_max".format(method))
+    return float(lam) * margin
+
+
+def estimate_lambda_max_batch(lap: SparseTensor, batch: torch.Tensor, num_graphs: int = None, method: str = "power",
+                              tol: float = 5e-3, max_iter: int = 200, margin: float = 1.01) -> torch.Tensor:
+    r"""
+    Estimate the largest eigenvalues of the diagonal blocks of a block-diagonal sparse Laplacian all at once, e.g.,
+    the Laplacian of a :class:`thgsp.graphs.GraphBatch`, instead of running an eigensolver per block.
+
+    Parameters
+    ----------
+    lap:    SparseTensor
+        The :obj:`(N,N)` symmetric block-diagonal Laplacian.
+    batch:  Tensor
+        The :obj:`(N,)` block every node belongs to.
+    num_graphs: int, optional
+        The number of blocks :obj:`B`.
+    method: str
+        :obj:`"power"`: power iterations on all blocks together, wherein the normalization and the Rayleigh quotient
+        are reduced per block. Estimates are capped by the Gershgorin bounds.
+        :obj:`"gershgorin"`: the Gershgorin circle bounds reduced per block.
+    tol:    float
+    max_iter:   int
+    margin: float
+        See :func:`estimate_lambda_max`.
+
+    Returns
+    -------
+    Tensor
+        The :obj:`(B,)` estimated :math:`\lambda_{max}` of every block.
+    """
+    N = lap.size(-1)
+    B = int(batch.max().item()) + 1 if num_graphs is None else num_graphs
+    row, col, val = lap.coo()
+    val = col.new_ones(col.shape, dtype=lap.dtype()) if val is None else val
+    radius = scatter_add(torch.where(row == col, val, val.abs()), row, dim=0, dim_size=N)
+    bound = scatter_max(radius, batch, dim=0, dim_size=B)[0]
+    if method == "gershgorin":
+        return bound
+    if method != "power":
+        raise RuntimeError("{} is not a supported method to estimate lambda_max of a batch".format(method))
+
+    tiny = torch.finfo(val.dtype).tiny
+    with torch.no_grad():
+        x = torch.rand(N, 1, dtype=val.dtype, device=val.device)
+        x /= scatter_add(x.view(-1).pow(2), batch, dim=0, dim_size=B).sqrt()[batch].view(-1, 1)
+        lam = x.new_zeros(B)
+        for _ in range(max_iter):
+            y = lap @ x
+            lam_new = scatter_add((x * y).view(-1), batch, dim=0, dim_size=B)  # Rayleigh quotients
+            norm = scatter_add(y.view(-1).pow(2), batch, dim=0, dim_size=B).sqrt()
+            x = y / norm.clamp_min(tiny)[batch].view(-1, 1)  # blocks without edges stay zeros
+            converged = ((lam_new - lam).abs() <= tol * lam_new.abs()).all().item()
+            lam = lam_new
+            if converged:
+                break
+    return torch.min(lam * margin, bound)
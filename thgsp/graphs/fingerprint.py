@@ -0,0 +1,35 @@
+import hashlib
+
+import numpy as np
+from torch_sparse import SparseTensor
+
+
+def fingerprint(adj: SparseTensor) -> str:
+    r"""
+    A content hash of a sparse matrix, which is identical for any two matrices with the same size, data type,
+    sparsity pattern and values, and thus can serve as a key to share Laplacians, spectra, colorings and bipartite
+    decompositions across graph objects.
+
+    The CSR arrays :obj:`rowptr`, :obj:`col` and :obj:`value` are streamed into BLAKE2b through their buffers without
+    extra copies(except for the unavoidable device-to-host transfer of CUDA tensors). For :class:`GraphBase`, use
+    :py:meth:`GraphBase.fingerprint` which memoizes the result.
+
+    Parameters
+    ----------
+    adj:    SparseTensor
+
+    Returns
+    -------
+    str
+        A 40-digit hexadecimal digest.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr((tuple(adj.sizes()), str(adj.dtype()))).encode())
+    rowptr, col, value = adj.csr()
+    for t in (rowptr, col, value):
+        if t is None:
+            h.update(b"\0")
+            continue
+        buf = np.ascontiguousarray(t.detach().cpu().numpy())  # a view for contiguous CPU tensors
+        h.update(memoryview(buf).cast("B"))
+    return h.hexdigest()
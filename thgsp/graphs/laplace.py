@@ -1,6 +1,8 @@
 import torch
 from torch_sparse import SparseTensor
 
+from thgsp.alg.spmm import spmm
+
 
 def laplace(adj: SparseTensor, lap_type=None):
     M, N = adj.sizes()
@@ -33,3 +35,122 @@ def laplace(adj: SparseTensor, lap_type=None):
     col = torch.cat([col.unsqueeze_(0), loop_index], 1).squeeze_()
     lap = SparseTensor(row=row, col=col, value=wgt, sparse_sizes=(M, N))
     return lap
+
+
+class LaplacianOperator:
+    r"""
+    A matrix-free Laplacian :math:`sL+tI`, which holds only the adjacency :math:`A` and the degree vector and applies
+    itself to signals by a fused scale--SpMM--axpy, e.g., for the symmetric normalized Laplacian
+
+    .. math::
+        (sL+tI)x = (s+t)x - sD^{-1/2}AD^{-1/2}x.
+
+    Hence no Laplacian(nor its rescaled copy for Chebyshev approximation) is materialized.
+
+    Parameters
+    ----------
+    adj:    SparseTensor
+        The :obj:`(N,N)` adjacency matrix.
+    lap_type:   str
+        One of :obj:`"sym"`, :obj:`"comb"` and :obj:`"rw"`, consistent with :func:`laplace`.
+    scale:  float, Tensor
+        :math:`s`, or an :obj:`(N,)` vector scaling every row, e.g., by :math:`2/\lambda_{max}` of the graph a node
+        belongs to in a :class:`thgsp.graphs.GraphBatch`.
+    shift:  float, Tensor
+        :math:`t`, or an :obj:`(N,)` vector.
+    deg:    Tensor, optional
+        The :obj:`(N,)` degree vector :obj:`adj.sum(0)`, computed if not given.
+    """
+
+    def __init__(self, adj: SparseTensor, lap_type="sym", scale=1., shift=0., deg=None):
+        M, N = adj.sizes()
+        assert M == N
+        self.adj = adj
+        self.lap_type = "sym" if lap_type is None else lap_type
+        self.scale = scale
+        self.shift = shift
+        self.deg = adj.sum(0) if deg is None else deg
+
+        # (sL+tI)x = diag * x + left * (A @ (right * x))
+        self._right = None
+        if self.lap_type == "sym":
+            deg05 = self.deg.pow(-0.5)
+            deg05[deg05 == float('inf')] = 0
+            self._diag = scale + shift
+            self._left = (-scale * deg05).unsqueeze(-1)
+            self._right = deg05.unsqueeze(-1)
+        elif self.lap_type == "rw":
+            deg_inv = 1.0 / self.deg
+            deg_inv[deg_inv == float('inf')] = 0
+            self._diag = scale + shift
+            self._left = (-scale * deg_inv).unsqueeze(-1)
+        elif self.lap_type == "comb":
+            self._diag = (scale * self.deg + shift).unsqueeze(-1)
+            self._left = -scale
+        else:
+            raise TypeError("Invalid laplace type: {}".format(lap_type))
+
+        def as_column(v):  # per-node scale and shift
+            return v.unsqueeze(-1) if isinstance(v, torch.Tensor) and v.dim() == 1 else v
+
+        self._diag = as_column(self._diag)
+        self._left = as_column(self._left)
+
+        # the (N,) vector forms of diag, left and right for the fused kernel
+        def as_vector(v):
+            return v.view(-1) if isinstance(v, torch.Tensor) else self.deg.new_full((N,), v)
+
+        self._vectors = (as_vector(self._diag), as_vector(self._left),
+                         None if self._right is None else self._right.view(-1))
+
+    def size(self, dim: int) -> int:
+        return self.adj.size(dim)
+
+    def sizes(self):
+        return self.adj.sizes()
+
+    def dtype(self):
+        return self.adj.dtype()
+
+    def device(self):
+        return self.adj.device()
+
+    def normalize(self, lam_max: float = 2.):
+        """
+        The operator :math:`2L/\\lambda_{max}-I` used by Chebyshev approximation, sharing the adjacency and degrees.
+        """
+        return self.__class__(self.adj, self.lap_type, self.scale * 2. / lam_max, self.shift * 2. / lam_max - 1.,
+                              self.deg)
+
+    def matmul(self, x: torch.Tensor, prev: torch.Tensor = None, alpha: float = 1., beta: float = 0.):
+        """
+        :math:`\\alpha(sL+tI)x+\\beta\\,prev` in a single pass over the adjacency, see :func:`thgsp.alg.spmm`.
+        """
+        if x.dim() <= 2:
+            diag, left, right = self._vectors
+            return spmm(self.adj, x, diag, left, right, prev, alpha, beta)
+
+        z = self.adj @ (x if self._right is None else self._right * x)  # batched
+        out = self._diag * x
+        if isinstance(self._left, torch.Tensor):
+            out = out.addcmul_(self._left, z)
+        else:
+            out = out.add_(z, alpha=self._left)
+        if alpha != 1:
+            out = out.mul_(alpha)
+        return out if prev is None else out.add_(prev, alpha=beta)
+
+    def __matmul__(self, x: torch.Tensor) -> torch.Tensor:
+        return self.matmul(x)
+
+    def to_sparse_tensor(self) -> SparseTensor:
+        lap = laplace(self.adj, self.lap_type)
+        row, col, val = lap.coo()
+        scale = self.scale[row] if isinstance(self.scale, torch.Tensor) else self.scale
+        shift = self.shift[row] if isinstance(self.shift, torch.Tensor) else self.shift
+        val = scale * val + shift * (row == col).to(val.dtype)
+        return SparseTensor(row=row, col=col, value=val, sparse_sizes=lap.sizes())
+
+    def __repr__(self):
+        return "{}(lap_type={}, scale={}, shift={}, N={}, nnz={})".format(
+            self.__class__.__name__, self.lap_type, self.scale, self.shift, self.size(0), self.adj.nnz())
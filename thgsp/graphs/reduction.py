@@ -0,0 +1,106 @@
+import numpy as np
+import torch
+from scipy.sparse import coo_matrix, csr_matrix, diags, issparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import spsolve
+from torch_sparse import SparseTensor
+
+from thgsp.convert import to_torch_sparse
+
+
+def kron_reduction(adj, keep, tol: float = 1e-2, max_degree: int = None, exact: bool = False) -> SparseTensor:
+    r"""
+    The Kron reduction of a graph onto the nodes :obj:`keep`, i.e., the graph whose combinatorial Laplacian is the
+    Schur complement
+
+    .. math::
+        L_{kk}-L_{kr}L_{rr}^{-1}L_{rk}
+
+    of the combinatorial Laplacian :math:`L` w.r.t. the removed nodes :math:`r`. Two kept nodes are adjacent if they
+    are connected through removed nodes, hence the reduced graph preserves the effective resistances among kept nodes.
+
+    :math:`L_{rr}^{-1}` is dense within every connected component of the removed nodes, so the exact reduction is
+    an almost complete graph. By default, the local reduction replaces :math:`L_{rr}` with its diagonal, i.e., every
+    removed node :math:`r` links each pair of its kept neighbors :math:`i,j` by the weight :math:`w_{ir}w_{rj}/d_r`.
+    It is exact if the removed nodes are independent, and costs :math:`O(\sum_rd_r^2)` otherwise. Either way, the
+    reduced graph is then sparsified by :obj:`tol` and :obj:`max_degree`.
+
+    Parameters
+    ----------
+    adj:    SparseTensor, Tensor, spmatrix
+        The :obj:`(N,N)` symmetric adjacency.
+    keep:   Tensor, array
+        The indices or the :obj:`(N,)` boolean mask of kept nodes.
+    tol:    float
+        An edge is dropped if its weight is no larger than :obj:`tol` times the largest weight at both of its ends.
+    max_degree: int, optional
+        If given, an edge is dropped unless it is among the :obj:`max_degree` heaviest ones at either of its ends,
+        hence the reduced graph has at most :obj:`2*max_degree*n` nonzeros.
+    exact:  bool
+        If True, compute the exact Schur complement by sparse solves. Connected components without any kept node are
+        ignored.
+
+    Returns
+    -------
+    SparseTensor
+        The :obj:`(n,n)` adjacency of the reduced graph, wherein :obj:`n` is the number of kept nodes, ordered as
+        :obj:`keep`.
+    """
+    adj = to_torch_sparse(adj)
+    N = adj.size(0)
+    dtype, device = adj.dtype(), adj.device()
+    keep = np.asarray(torch.as_tensor(keep).cpu())
+    if keep.dtype == bool:
+        keep = np.nonzero(keep)[0]
+    A = adj.to_scipy(layout="csr").astype(np.float64)
+    A.setdiag(0)
+    A.eliminate_zeros()
+    deg = np.asarray(A.sum(1)).reshape(-1)
+
+    removed = np.ones(N, dtype=bool)
+    removed[keep] = False
+    if exact:
+        L = (diags(deg) - A).tocsr()
+        _, label = connected_components(A, directed=False)
+        reachable = np.isin(label, label[keep])  # the Schur complement is singular on components without kept nodes
+        removed = np.nonzero(removed & reachable)[0]
+        L_kept = L[keep]
+        L_red = L_kept[:, keep]
+        if len(removed) > 0:
+            L_kr = L_kept[:, removed].tocsc()
+            X = spsolve(L[removed][:, removed].tocsc(), L_kr.T.tocsc())  # sparse since the right-hand side is sparse
+            X = X if issparse(X) else csr_matrix(X.reshape(len(removed), -1))
+            L_red = L_red - L_kr @ X
+        W = coo_matrix(-L_red)
+    else:
+        removed = np.nonzero(removed & (deg > 0))[0]
+        A_kept = A[keep]
+        A_kr = A_kept[:, removed]
+        W = coo_matrix(A_kept[:, keep] + A_kr @ diags(1 / deg[removed]) @ A_kr.T)
+
+    mask = (W.row != W.col) & (W.data > 0)
+    row, col, weight = W.row[mask], W.col[mask], W.data[mask]
+    n = len(keep)
+    W = _sparsify(row, col, weight, n, tol, max_degree).tocoo()
+
+    row = torch.as_tensor(W.row, dtype=torch.long, device=device)
+    col = torch.as_tensor(W.col, dtype=torch.long, device=device)
+    value = torch.as_tensor(W.data, dtype=dtype, device=device)
+    return SparseTensor(row=row, col=col, value=value, sparse_sizes=(n, n)).coalesce()
+
+
+def _sparsify(row, col, weight, n, tol, max_degree=None):
+    # select edges per row, and keep an edge selected at either end for symmetry
+    selected = np.ones(len(weight), dtype=bool)
+    if len(weight) > 0 and tol > 0:
+        strongest = np.zeros(n)
+        np.maximum.at(strongest, row, weight)
+        selected &= weight > tol * strongest[row]
+    if max_degree is not None:
+        order = np.lexsort((-weight, row))  # by row, the heaviest first
+        start = np.searchsorted(row[order], np.arange(n))
+        rank = np.empty(len(weight), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - start[row[order]]
+        selected &= rank < max_degree
+    W = csr_matrix((weight[selected], (row[selected], col[selected])), shape=(n, n))
+    return W.maximum(W.T)
@@ -0,0 +1,83 @@
+import os
+import os.path as osp
+
+import numpy as np
+import torch
+
+
+class EigenStore:
+    r"""
+    A persistent store of eigenbases and other per-graph tensors(e.g. Chebyshev coefficients), keyed by the content
+    hash of graphs, see :func:`thgsp.graphs.fingerprint`.
+
+    Tensors are written to :obj:`root/<digest>/<name>.npy` as raw arrays and reopened memory-mapped, so the operating
+    system keeps only one physical copy of an eigenbasis shared by all processes reading it. The mapping is
+    copy-on-write: in-place modifications of a loaded tensor are private to the process and never reach the disk.
+
+    Parameters
+    ----------
+    root:   str
+        The directory of the store, created if absent.
+    """
+
+    def __init__(self, root: str):
+        self.root = osp.abspath(osp.expanduser(root))
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, digest: str, name: str) -> str:
+        return osp.join(self.root, digest, name + ".npy")
+
+    def __contains__(self, item):
+        digest, name = item
+        return osp.exists(self.path(digest, name))
+
+    def save(self, digest: str, name: str, tensor: torch.Tensor):
+        path = self.path(digest, name)
+        os.makedirs(osp.dirname(path), exist_ok=True)
+        tmp = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp, "wb") as f:
+            np.save(f, tensor.detach().cpu().numpy())
+        os.replace(tmp, path)  # atomic, concurrent readers never see a partial file
+
+    def load(self, digest: str, name: str, dtype=None, device=None):
+        path = self.path(digest, name)
+        if not osp.exists(path):
+            return None
+        tensor = torch.from_numpy(np.load(path, mmap_mode="c"))
+        if dtype is not None or device is not None:
+            tensor = tensor.to(dtype=dtype, device=device)  # no copy for the same dtype and CPU
+        return tensor
+
+    @staticmethod
+    def spectral_name(lap_type, k=None, which="SA", dtype=torch.float):
+        """
+        The name of an eigenbasis, which includes the data type so that a lookup never converts stored eigenpairs of
+        another precision.
+        """
+        name = "eig-{}-full".format(lap_type) if k is None else "eig-{}-{}{}".format(lap_type, which, k)
+        return name + "-" + str(dtype).replace("torch.", "")
+
+    def save_spectral(self, digest, fs, U=None, lap_type="sym", k=None, which="SA"):
+        name = self.spectral_name(lap_type, k, which, fs.dtype)
+        if U is not None:
+            self.save(digest, name + "-U", U)
+        self.save(digest, name + "-fs", fs)
+
+    def load_spectral(self, digest, lap_type="sym", k=None, which="SA", dtype=torch.float, device=None):
+        """
+        Load the eigenbasis of data type :obj:`dtype`.
+
+        Returns
+        -------
+        fs: Tensor, None
+            The eigenvalues, :obj:`None` if not stored.
+        U:  Tensor, None
+            The eigenvectors, :obj:`None` if not stored.
+        """
+        name = self.spectral_name(lap_type, k, which, dtype)
+        fs = self.load(digest, name + "-fs", dtype, device)
+        U = self.load(digest, name + "-U", dtype, device)
+        return fs, U
+
+    def __repr__(self):
+        return "{}(root={})".format(self.__class__.__name__, self.root)